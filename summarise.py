@@ -1,145 +1,1148 @@
+import abc
 import os
+import asyncio
 import json
 import requests
 import subprocess
-from datetime import datetime
+from datetime import datetime, timezone
 import re
+import shutil
+import sqlite3
+import string
 import base64
+import functools
+import html
+import hashlib
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Configuration using environment variables
+# Several comma-separated LLM endpoints are load balanced as one pool
 API_ENDPOINT = os.getenv("LOCAL_LLM_API", "http://127.0.0.1:5000/v1/chat/completions")
+API_ENDPOINTS = [url.strip() for url in API_ENDPOINT.split(",") if url.strip()]
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_USERNAME = os.getenv("GITHUB_USERNAME", "")
+
+# Users or organisations to summarise in one run, one report each (defaults to GITHUB_USERNAME);
+# organisations are written as "org:<name>" and listed through /orgs/<name>/repos
+GITHUB_TARGETS = []
+ORG_TARGETS = set()
+for target in os.getenv("GITHUB_TARGETS", GITHUB_USERNAME).split(","):
+    target = target.strip()
+    if target.lower().startswith("org:"):
+        target = target[len("org:"):].strip()
+        ORG_TARGETS.add(target)
+    if target:
+        GITHUB_TARGETS.append(target)
+GITHUB_USERNAME = GITHUB_USERNAME or (GITHUB_TARGETS[0] if GITHUB_TARGETS else "")
 OUTPUT_DIR = os.path.expanduser(os.getenv("OUTPUT_DIR", "~/Documents/github-summaries"))
 
-# Validate required environment variables
+# GitHub API locations (override to point at GitHub Enterprise or a local stub server)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+
+# Repository listing filters: REPO_TYPE is sent to the API (organisations default to "sources" so
+# forks are never downloaded), the others are applied to each listing page as it arrives
+REPO_TYPE = os.getenv("REPO_TYPE", "").lower()
+REPO_VISIBILITY = os.getenv("REPO_VISIBILITY", "all").lower()
+INCLUDE_FORKS = os.getenv("INCLUDE_FORKS", "false").lower() in ("1", "true", "yes")
+EXCLUDE_ARCHIVED = os.getenv("EXCLUDE_ARCHIVED", "false").lower() in ("1", "true", "yes")
+MIN_STARS = max(0, int(os.getenv("MIN_STARS", "0")))
+# ISO 8601 date or timestamp; the listing is sorted by update time so paging stops once it is passed
+UPDATED_SINCE = os.getenv("UPDATED_SINCE", "")
+REPO_NAME_PATTERN = re.compile(os.getenv("REPO_NAME_PATTERN")) if os.getenv("REPO_NAME_PATTERN") else None
+
+# Where repository details come from: "rest" (one call per endpoint), "graphql" (batched queries)
+# or "local" (git mirrors on disk, no API calls)
+DATA_SOURCE = os.getenv("DATA_SOURCE", "rest").lower()
+GRAPHQL_BATCH_SIZE = max(1, int(os.getenv("GRAPHQL_BATCH_SIZE", "20")))
+
+# Local mirror mode: directory of bare or working-tree clones, worker processes, and whether to clone missing repositories
+LOCAL_REPOS_DIR = os.path.expanduser(os.getenv("LOCAL_REPOS_DIR", os.path.join(OUTPUT_DIR, "mirrors")))
+LOCAL_WORKERS = max(1, int(os.getenv("LOCAL_WORKERS", str(os.cpu_count() or 1))))
+LOCAL_CLONE_MISSING = os.getenv("LOCAL_CLONE_MISSING", "false").lower() in ("1", "true", "yes")
+
+# How commits are counted: "link", "graphql", "contributors", or "auto" to fall back through them in that order
+COMMIT_COUNT_STRATEGY = os.getenv("COMMIT_COUNT_STRATEGY", "auto").lower()
+
+# Concurrent pipeline: GitHub fetching and LLM summarisation run in separate worker pools
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "false").lower() in ("1", "true", "yes")
+FETCH_CONCURRENCY = max(1, int(os.getenv("FETCH_CONCURRENCY", "4")))
+# Cap on in-flight requests per LLM endpoint: one number for all, or one per LOCAL_LLM_API entry;
+# LLM_CONCURRENCY defaults to the sum of the caps, or one worker per endpoint
+LLM_ENDPOINT_CONCURRENCY = [max(1, int(cap)) for cap in os.getenv("LLM_ENDPOINT_CONCURRENCY", "").split(",") if cap.strip()]
+if len(LLM_ENDPOINT_CONCURRENCY) == 1:
+    LLM_ENDPOINT_CONCURRENCY *= len(API_ENDPOINTS)
+LLM_CONCURRENCY = max(1, int(os.getenv("LLM_CONCURRENCY", str(sum(LLM_ENDPOINT_CONCURRENCY) or len(API_ENDPOINTS)))))
+# Circuit breaker: consecutive failures that take an LLM endpoint out of rotation, and seconds
+# before it is health-checked again
+LLM_BREAKER_THRESHOLD = max(1, int(os.getenv("LLM_BREAKER_THRESHOLD", "3")))
+LLM_HEALTH_INTERVAL = max(0.0, float(os.getenv("LLM_HEALTH_INTERVAL", "30")))
+
+# LLM request retries with jittered exponential backoff (base and cap in seconds), and connect and
+# read timeouts in seconds; the read timeout bounds each wait for data, so 0 waits indefinitely
+LLM_RETRIES = max(0, int(os.getenv("LLM_RETRIES", "3")))
+LLM_BACKOFF = max(0.0, float(os.getenv("LLM_BACKOFF", "1")))
+LLM_BACKOFF_MAX = max(0.0, float(os.getenv("LLM_BACKOFF_MAX", "60")))
+LLM_CONNECT_TIMEOUT = max(0.1, float(os.getenv("LLM_CONNECT_TIMEOUT", "10")))
+LLM_TIMEOUT = max(0.0, float(os.getenv("LLM_TIMEOUT", "300")))
+LLM_TIMEOUTS = (LLM_CONNECT_TIMEOUT, LLM_TIMEOUT or None)
+
+# Request a repository's GitHub endpoints in parallel instead of one after another
+ASYNC_FETCH = os.getenv("ASYNC_FETCH", "false").lower() in ("1", "true", "yes")
+
+# Persistent HTTP sessions shared by all GitHub and LLM calls
+HTTP_POOL_SIZE = max(1, int(os.getenv("HTTP_POOL_SIZE", str(max(10, FETCH_CONCURRENCY * 4)))))
+HTTP_RETRIES = max(0, int(os.getenv("HTTP_RETRIES", "3")))
+HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "true").lower() in ("1", "true", "yes")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+# GitHub rate-limit pacing: request rate ceiling, requests kept in reserve, and retries after rate-limit responses
+GITHUB_MAX_RPS = max(0.1, float(os.getenv("GITHUB_MAX_RPS", "10")))
+RATE_LIMIT_RESERVE = max(0, int(os.getenv("RATE_LIMIT_RESERVE", "10")))
+RATE_LIMIT_MAX_WAITS = max(0, int(os.getenv("RATE_LIMIT_MAX_WAITS", "10")))
+# Longest single backoff, in seconds, for secondary rate limits that give no Retry-After
+RATE_LIMIT_BACKOFF_MAX = max(60.0, float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "900")))
+
+# On-disk cache of GitHub responses, revalidated with ETag / Last-Modified
+HTTP_CACHE = os.getenv("HTTP_CACHE", "true").lower() in ("1", "true", "yes")
+HTTP_CACHE_DIR = os.path.expanduser(os.getenv("HTTP_CACHE_DIR", os.path.join(OUTPUT_DIR, ".cache", "http")))
+
+# Persistent per-repository state used to skip the LLM for unchanged repositories
+STATE_DB = os.path.expanduser(os.getenv("STATE_DB", os.path.join(OUTPUT_DIR, "summariser_state.db")))
+FORCE_REFRESH = os.getenv("FORCE_REFRESH", "false").lower() in ("1", "true", "yes")
+
+# Append-only journal of completed repositories, reloaded when RESUME is set
+CHECKPOINT_FILE = os.path.expanduser(os.getenv("CHECKPOINT_FILE", os.path.join(OUTPUT_DIR, ".checkpoint.jsonl")))
+RESUME = os.getenv("RESUME", "false").lower() in ("1", "true", "yes")
+
+# Report output: format, optional user template files, and where Obsidian notes go
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "markdown").lower()
+HEADER_TEMPLATE = os.getenv("HEADER_TEMPLATE", "")
+REPO_TEMPLATE = os.getenv("REPO_TEMPLATE", "")
+OBSIDIAN_NOTES_DIR = os.getenv("OBSIDIAN_NOTES_DIR", "repositories")
+OBSIDIAN_INDEX_NOTE = os.getenv("OBSIDIAN_INDEX_NOTE", "GitHub Repositories.md")
+
+# Model name sent to the LLM endpoint (optional, also part of the summary cache key)
+LLM_MODEL = os.getenv("LLM_MODEL", "")
+
+# Streamed completions with cutoffs for runaway output (0 disables a limit)
+LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() in ("1", "true", "yes")
+LLM_MAX_TOKENS = max(0, int(os.getenv("LLM_MAX_TOKENS", "0")))
+LLM_MAX_LATENCY = max(0.0, float(os.getenv("LLM_MAX_LATENCY", "0")))
+
+# Token budget for the README excerpt in each prompt; badges, HTML and code blocks are stripped
+# and the most descriptive sections are kept first
+README_TOKEN_BUDGET = max(0, int(os.getenv("README_TOKEN_BUDGET", "250")))
+
+# Input-token budget for each repository's prompt (0 disables), and the tokenizer used to count
+# tokens: a tiktoken encoding name or a Hugging Face tokenizer.json path (optional packages);
+# without one, tokens are estimated at about four characters each
+PROMPT_TOKEN_BUDGET = max(0, int(os.getenv("PROMPT_TOKEN_BUDGET", "0")))
+TOKENIZER = os.getenv("TOKENIZER", "")
+
+# Two-tier summarisation: repositories below every threshold get an extractive summary built from
+# their description, README and topics instead of an LLM call (size in KB, README length in tokens)
+EXTRACTIVE_SUMMARIES = os.getenv("EXTRACTIVE_SUMMARIES", "false").lower() in ("1", "true", "yes")
+LLM_MIN_SIZE_KB = max(0, int(os.getenv("LLM_MIN_SIZE_KB", "500")))
+LLM_MIN_STARS = max(0, int(os.getenv("LLM_MIN_STARS", "1")))
+LLM_MIN_README_TOKENS = max(0, int(os.getenv("LLM_MIN_README_TOKENS", "150")))
+
+# Number of repositories packed into a single summarisation request
+LLM_BATCH_SIZE = max(1, int(os.getenv("LLM_BATCH_SIZE", "1")))
+
+# Content-addressed cache of LLM summaries keyed by prompt, model and endpoint
+LLM_CACHE = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = os.path.expanduser(os.getenv("LLM_CACHE_DIR", os.path.join(OUTPUT_DIR, ".cache", "llm")))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024
+
+# Validate required environment variables (local mirror mode needs no GitHub token unless it clones)
 required_vars = ["LOCAL_LLM_API", "GITHUB_TOKEN", "GITHUB_USERNAME"]
+if DATA_SOURCE == "local" and not LOCAL_CLONE_MISSING:
+    required_vars.remove("GITHUB_TOKEN")
+if os.getenv("GITHUB_TARGETS"):
+    required_vars.remove("GITHUB_USERNAME")
 for var in required_vars:
     if not os.getenv(var):
         raise ValueError(f"Environment variable {var} is not set.")
 
-def fetch_user_repositories():
-    """Fetch all repositories created by the user (excluding forks)"""
-    headers = {
+def create_session(pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES, keep_alive=HTTP_KEEP_ALIVE):
+    """Create a requests session with a sized connection pool and automatic retries"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+# One pool for the GitHub API and a separate one for the LLM endpoints, whose retries are
+# handled by LLMEndpointPool so they can fail over and back off
+github_session = create_session()
+llm_session = create_session(pool_size=max(LLM_CONCURRENCY, 2), retries=0)
+
+def github_headers():
+    """Return the headers used for every GitHub API request"""
+    return {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
+
+# mkstemp() creates files readable only by their owner. The umask can only be read by setting
+# it, so it is read once here rather than from worker threads
+PROCESS_UMASK = os.umask(0o022)
+os.umask(PROCESS_UMASK)
+
+def replace_with_temp_file(tmp_path, path):
+    """Move a mkstemp() file into place with the permissions open() would have given it"""
+    os.chmod(tmp_path, 0o666 & ~PROCESS_UMASK)
+    os.replace(tmp_path, path)
+
+class HTTPCache:
+    """URL-keyed on-disk store of response bodies with their validators"""
     
-    repos = []
-    page = 1
+    # Response headers worth replaying when a cached body is reused
+    KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
     
-    while True:
-        url = f"https://api.github.com/users/{GITHUB_USERNAME}/repos?page={page}&per_page=100"
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+    def __init__(self, cache_dir):
+        # Created on the first store so importing the module never touches OUTPUT_DIR
+        self.cache_dir = Path(cache_dir)
+    
+    def _path(self, url):
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    
+    def load(self, url):
+        try:
+            with open(self._path(url), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def store(self, url, response):
+        headers = {name: response.headers[name] for name in self.KEPT_HEADERS if name in response.headers}
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
         
-        page_repos = response.json()
-        if not page_repos:
-            break
-            
-        # Filter out forked repositories
-        original_repos = [repo for repo in page_repos if not repo["fork"]]
-        repos.extend(original_repos)
+        entry = {"url": url, "headers": headers, "body": response.text}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        replace_with_temp_file(tmp_path, self._path(url))
+    
+    def conditional_headers(self, entry):
+        headers = {}
+        if "ETag" in entry["headers"]:
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if "Last-Modified" in entry["headers"]:
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+    
+    def to_response(self, entry):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.headers.update(entry["headers"])
+        response.encoding = "utf-8"
+        response._content = entry["body"].encode("utf-8")
+        return response
+
+http_cache = HTTPCache(HTTP_CACHE_DIR) if HTTP_CACHE else None
+
+class RateLimiter:
+    """Token bucket that paces GitHub requests and pauses when the rate limit runs out
+    
+    The bucket refills at max_rate requests per second. The X-RateLimit-*
+    and Retry-After headers of every response can pause all callers until
+    the limit resets, so requests wait instead of failing.
+    """
+    
+    def __init__(self, name, max_rate=GITHUB_MAX_RPS, reserve=RATE_LIMIT_RESERVE):
+        self.name = name
+        self.max_rate = max_rate
+        self.reserve = reserve
+        self._tokens = max(1.0, max_rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                pause = self._paused_until - time.time()
+                if pause <= 0:
+                    now = time.monotonic()
+                    self._tokens = min(max(1.0, self.max_rate), self._tokens + (now - self._updated) * self.max_rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    pause = (1 - self._tokens) / self.max_rate
+            time.sleep(pause)
+    
+    def pause(self, seconds, reason):
+        """Hold back every caller for the given number of seconds"""
+        with self._lock:
+            until = time.time() + seconds
+            if until <= self._paused_until:
+                return
+            self._paused_until = until
+        print(f"  {reason}; pausing {self.name} requests for {seconds:.0f}s.")
+    
+    def update(self, response):
+        """Pause ahead of time if the response shows the rate limit is nearly used up"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None and int(remaining) <= self.reserve:
+            self.pause(max(1.0, int(reset) - time.time() + 1), f"{remaining} {self.name} requests left")
+    
+    def retry_delay(self, response, attempt):
+        """Return how long to wait before retrying a rate-limited response, or None if it was not rate limited"""
+        if response.status_code not in (403, 429):
+            return None
         
-        page += 1
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            return max(1.0, float(retry_after))
+        
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+            return max(1.0, int(reset) - time.time() + 1)
+        
+        # Secondary rate limits without Retry-After: wait at least a minute, backing off exponentially
+        if response.status_code == 429 or "rate limit" in response.text.lower():
+            return min(60.0 * (2 ** attempt), RATE_LIMIT_BACKOFF_MAX)
+        return None
     
-    print(f"Found {len(repos)} original repositories.")
-    return repos
+    def send(self, method, url, **kwargs):
+        """Send a request through the limiter, waiting out rate-limit responses instead of failing"""
+        attempt = 0
+        while True:
+            self.acquire()
+            response = github_session.request(method, url, timeout=HTTP_TIMEOUT, **kwargs)
+            self.update(response)
+            
+            delay = self.retry_delay(response, attempt)
+            if delay is None or attempt >= RATE_LIMIT_MAX_WAITS:
+                return response
+            self.pause(delay, f"Rate limited on {url}")
+            attempt += 1
 
-def fetch_repo_details(repo_name):
-    """Fetch additional details about a repository"""
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+# The REST and GraphQL APIs have separate rate-limit budgets
+rest_rate_limiter = RateLimiter("REST")
+graphql_rate_limiter = RateLimiter("GraphQL")
+
+def github_get(url):
+    """GET a GitHub API URL and raise for any error status, revalidating cached responses"""
+    headers = github_headers()
+    entry = http_cache.load(url) if http_cache else None
+    if entry:
+        headers.update(http_cache.conditional_headers(entry))
     
-    # Get repository information
-    repo_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}"
-    repo_response = requests.get(repo_url, headers=headers)
-    repo_response.raise_for_status()
-    repo_data = repo_response.json()
+    response = rest_rate_limiter.send("GET", url, headers=headers)
     
-    # Get languages used
-    languages_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}/languages"
-    languages_response = requests.get(languages_url, headers=headers)
-    languages_response.raise_for_status()
-    languages_data = languages_response.json()
+    # 304 Not Modified responses do not count against the GitHub rate limit
+    if entry and response.status_code == 304:
+        return http_cache.to_response(entry)
     
-    # Get README content if available
-    readme_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}/readme"
+    response.raise_for_status()
+    if http_cache:
+        http_cache.store(url, response)
+    return response
+
+def repos_listing_url(owner):
+    """Return the repository listing URL for a user or an organisation target"""
+    if owner in ORG_TARGETS:
+        kind = "orgs"
+        repo_type = REPO_TYPE or ("all" if INCLUDE_FORKS else "sources")
+    else:
+        # The user listing only knows "all", "owner" and "member"; forks are filtered client-side
+        kind = "users"
+        repo_type = REPO_TYPE if REPO_TYPE in ("all", "owner", "member") else "owner"
+    return f"{GITHUB_API_URL}/{kind}/{owner}/repos?type={repo_type}&sort=updated&direction=desc&per_page=100"
+
+def repo_matches_filters(repo):
+    """Return True if a listed repository passes the client-side listing filters"""
+    if repo.get("fork") and not INCLUDE_FORKS:
+        return False
+    if repo.get("archived") and EXCLUDE_ARCHIVED:
+        return False
+    if REPO_VISIBILITY != "all":
+        visibility = repo.get("visibility") or ("private" if repo.get("private") else "public")
+        if visibility != REPO_VISIBILITY:
+            return False
+    if (repo.get("stargazers_count") or 0) < MIN_STARS:
+        return False
+    if UPDATED_SINCE and (repo.get("updated_at") or "") < UPDATED_SINCE:
+        return False
+    if REPO_NAME_PATTERN and not REPO_NAME_PATTERN.search(repo["name"]):
+        return False
+    return True
+
+def listing_cutoff_reached(page_repos):
+    """Return True once a listing page (newest first) reaches repositories older than UPDATED_SINCE"""
+    return bool(UPDATED_SINCE and page_repos and (page_repos[-1].get("updated_at") or "") < UPDATED_SINCE)
+
+def iter_listing_pages(owner=GITHUB_USERNAME):
+    """Yield the pages of a user's or organisation's repository listing in order
+    
+    Page 1 is fetched first. Its Link rel="last" header gives the page count,
+    and the remaining pages are requested FETCH_CONCURRENCY at a time so
+    nothing further is downloaded once the caller stops iterating.
+    """
+    url = repos_listing_url(owner)
+    first_page = github_get(f"{url}&page=1")
+    yield first_page.json()
+    
+    last_page = last_page_number(first_page) or 1
+    if last_page > 1:
+        with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as pool:
+            for start in range(2, last_page + 1, FETCH_CONCURRENCY):
+                pages = range(start, min(start + FETCH_CONCURRENCY, last_page + 1))
+                yield from pool.map(lambda page: github_get(f"{url}&page={page}").json(), pages)
+
+def fetch_user_repositories(owner=GITHUB_USERNAME):
+    """Fetch the repositories of a user or organisation that pass the listing filters"""
+    repos = []
+    for page_repos in iter_listing_pages(owner):
+        repos.extend(repo for repo in page_repos if repo_matches_filters(repo))
+        if listing_cutoff_reached(page_repos):
+            break
+    
+    print(f"Found {len(repos)} matching repositories for {owner}.")
+    return repos
+
+def fetch_repo_data(repo_name, owner=GITHUB_USERNAME):
+    """Fetch the repository metadata object"""
+    repo_url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}"
+    return github_get(repo_url).json()
+
+def fetch_repo_languages(repo_name, owner=GITHUB_USERNAME):
+    """Fetch the language byte breakdown of a repository"""
+    languages_url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/languages"
+    return github_get(languages_url).json()
+
+def fetch_repo_readme(repo_name, owner=GITHUB_USERNAME):
+    """Fetch the decoded README of a repository, or an empty string if there is none"""
+    readme_url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/readme"
     try:
-        readme_response = requests.get(readme_url, headers=headers)
-        readme_response.raise_for_status()
-        readme_data = readme_response.json()
-        readme_content = base64.b64decode(readme_data["content"]).decode("utf-8")
+        readme_data = github_get(readme_url).json()
+        return base64.b64decode(readme_data["content"]).decode("utf-8")
     except:
-        readme_content = ""
-    
-    # Get commit count
-    commit_count = 0
+        return ""
+
+def last_page_number(response):
+    """Return the page number of the Link rel="last" URL, or None if there is only one page"""
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return None
+    return int(parse_qs(urlparse(last_url).query)["page"][0])
+
+def count_commits_link(repo_name, owner=GITHUB_USERNAME):
+    """Count commits from the Link rel="last" page number of a one-commit-per-page listing"""
+    commits_url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/commits?per_page=1"
     try:
-        commits_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}/commits?per_page=1"
-        commits_response = requests.get(commits_url, headers=headers)
-        commits_response.raise_for_status()
-        
-        if 'Link' in commits_response.headers:
-            links = commits_response.headers['Link']
-            if 'rel="last"' in links:
-                last_page_url = [link.split(';')[0].strip('<>') for link in links.split(',') if 'rel="last"' in link][0]
-                commit_count = int(re.search(r'page=(\d+)', last_page_url).group(1))
-        else:
-            # If no Link header, try to count manually but with better error handling
-            try:
-                commits_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}/commits?per_page=100"
-                page = 1
-                while True:
-                    paged_url = f"{commits_url}&page={page}"
-                    page_response = requests.get(paged_url, headers=headers)
-                    page_response.raise_for_status()
-                    page_commits = page_response.json()
-                    if not page_commits:
-                        break
-                    commit_count += len(page_commits)
-                    page += 1
-                    if page > 10:  # Reasonable limit to avoid excessive API calls
-                        print(f"  Warning: Repository {repo_name} has many commits, limiting count to 1000+")
-                        commit_count = "1000+"
-                        break
-            except requests.exceptions.HTTPError as e:
-                print(f"  Warning: Error fetching commit count for {repo_name}: {e}")
-                commit_count = "Unknown"
+        commits_response = github_get(commits_url)
     except requests.exceptions.HTTPError as e:
-        print(f"  Warning: Error fetching commit count for {repo_name}: {e}")
-        commit_count = "Unknown"
+        # GitHub answers 409 Conflict for repositories without any commits
+        if e.response is not None and e.response.status_code == 409:
+            return 0
+        raise
     
+    last_page = last_page_number(commits_response)
+    if last_page is not None:
+        return last_page
+    # Without a Link header everything fits on the single page already downloaded
+    return len(commits_response.json())
+
+def count_commits_graphql(repo_name, owner=GITHUB_USERNAME):
+    """Count commits on the default branch with a GraphQL history totalCount"""
+    query = """
+    query($owner: String!, $name: String!) {
+      repository(owner: $owner, name: $name) {
+        defaultBranchRef { target { ... on Commit { history { totalCount } } } }
+      }
+    }
+    """
+    data = github_graphql(query, {"owner": owner, "name": repo_name})
+    if not data.get("repository"):
+        raise ValueError(f"Repository {repo_name} not found via GraphQL")
+    branch = data["repository"]["defaultBranchRef"]
+    return branch["target"]["history"]["totalCount"] if branch else 0
+
+def count_commits_contributors(repo_name, owner=GITHUB_USERNAME):
+    """Count commits by summing per-contributor contribution counts"""
+    contributors_url = f"{GITHUB_API_URL}/repos/{owner}/{repo_name}/contributors?per_page=100&anon=1"
+    response = github_get(contributors_url)
+    if response.status_code == 204:
+        return 0
+    
+    total = sum(contributor["contributions"] for contributor in response.json())
+    for page in range(2, (last_page_number(response) or 1) + 1):
+        total += sum(contributor["contributions"] for contributor in github_get(f"{contributors_url}&page={page}").json())
+    return total
+
+COMMIT_COUNTERS = {
+    "link": count_commits_link,
+    "graphql": count_commits_graphql,
+    "contributors": count_commits_contributors,
+}
+
+def fetch_commit_count(repo_name, owner=GITHUB_USERNAME):
+    """Count the commits in a repository without downloading the commit history
+    
+    COMMIT_COUNT_STRATEGY selects a single strategy; "auto" tries each one
+    in turn until one succeeds.
+    """
+    if COMMIT_COUNT_STRATEGY == "auto":
+        strategies = ["link", "graphql", "contributors"]
+    else:
+        strategies = [COMMIT_COUNT_STRATEGY]
+    
+    for strategy in strategies:
+        try:
+            return COMMIT_COUNTERS[strategy](repo_name, owner)
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"  Warning: Error fetching commit count for {repo_name} via {strategy}: {e}")
+    
+    return "Unknown"
+
+def build_repo_details(repo_data, languages_data, readme_content, commit_count):
+    """Assemble the repository details dict consumed by the summary and markdown steps"""
     return {
         "name": repo_data["name"],
+        "owner": repo_data["owner"]["login"],
         "description": repo_data["description"] or "",
         "url": repo_data["html_url"],
         "created_at": repo_data["created_at"],
         "updated_at": repo_data["updated_at"],
+        "pushed_at": repo_data.get("pushed_at"),
         "stars": repo_data["stargazers_count"],
         "forks": repo_data["forks_count"],
         "languages": languages_data,
         "readme": readme_content,
         "commit_count": commit_count,
-        "topics": repo_data.get("topics", [])
+        "topics": repo_data.get("topics", []),
+        # Size in KB as reported by GitHub, or estimated from the language byte counts
+        "size": repo_data["size"] if repo_data.get("size") is not None else sum(languages_data.values()) // 1024
     }
 
-def generate_repo_summary(repo_details):
-    """Generate a summary of the repository using the LLM"""
+# Repository object fields build_repo_details() reads; listing pages normally carry all of them
+REPO_METADATA_FIELDS = ("name", "owner", "description", "html_url", "created_at", "updated_at",
+                        "stargazers_count", "forks_count", "topics")
+
+def has_repo_metadata(listing):
+    """Return True if a listing object can stand in for GET /repos/{owner}/{name}"""
+    return bool(listing) and all(field in listing for field in REPO_METADATA_FIELDS)
+
+def fetch_repo_details(repo_name, owner=GITHUB_USERNAME, listing=None):
+    """Fetch additional details about a repository
     
-    # Create a prompt for the LLM
-    prompt = f"""
+    The repository object from the listing is reused when it has every
+    metadata field, so only languages, README and commits are requested.
+    """
+    repo_data = listing if has_repo_metadata(listing) else fetch_repo_data(repo_name, owner)
+    languages_data = fetch_repo_languages(repo_name, owner)
+    readme_content = fetch_repo_readme(repo_name, owner)
+    commit_count = fetch_commit_count(repo_name, owner)
+    
+    return build_repo_details(repo_data, languages_data, readme_content, commit_count)
+
+class AsyncGitHubClient:
+    """Awaitable wrapper that runs the blocking GitHub calls on a shared thread pool"""
+    
+    def __init__(self, max_workers=None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or FETCH_CONCURRENCY * 4)
+    
+    async def call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def get_json(self, url):
+        response = await self.call(github_get, url)
+        return response.json()
+
+async_github_client = AsyncGitHubClient()
+
+async def async_fetch_user_repositories(owner=GITHUB_USERNAME, client=async_github_client):
+    """Async variant of fetch_user_repositories()"""
+    url = repos_listing_url(owner)
+    first_page = await client.call(github_get, f"{url}&page=1")
+    last_page = last_page_number(first_page) or 1
+    
+    repos = []
+    pages = [first_page.json()]
+    next_page = 2
+    while pages:
+        page_repos = pages.pop(0)
+        repos.extend(repo for repo in page_repos if repo_matches_filters(repo))
+        if listing_cutoff_reached(page_repos):
+            break
+        if not pages and next_page <= last_page:
+            wave = range(next_page, min(next_page + FETCH_CONCURRENCY, last_page + 1))
+            pages = list(await asyncio.gather(*(client.get_json(f"{url}&page={page}") for page in wave)))
+            next_page = wave.stop
+    
+    print(f"Found {len(repos)} matching repositories for {owner}.")
+    return repos
+
+async def reuse_listing(listing):
+    """Awaitable that returns an already fetched listing object"""
+    return listing
+
+async def async_fetch_repo_details(repo_name, owner=GITHUB_USERNAME, listing=None, client=async_github_client):
+    """Async variant of fetch_repo_details() that requests all endpoints at once"""
+    repo_data, languages_data, readme_content, commit_count = await asyncio.gather(
+        reuse_listing(listing) if has_repo_metadata(listing) else client.call(fetch_repo_data, repo_name, owner),
+        client.call(fetch_repo_languages, repo_name, owner),
+        client.call(fetch_repo_readme, repo_name, owner),
+        client.call(fetch_commit_count, repo_name, owner),
+    )
+    return build_repo_details(repo_data, languages_data, readme_content, commit_count)
+
+def fetch_repo_details_concurrently(repo_name, owner=GITHUB_USERNAME, listing=None):
+    """Blocking entry point to async_fetch_repo_details() for worker threads"""
+    return asyncio.run(async_fetch_repo_details(repo_name, owner, listing))
+
+# Fields requested for every repository in a GraphQL batch; README filenames are tried in order
+GRAPHQL_REPO_FRAGMENT = """
+fragment RepoDetails on Repository {
+  name
+  owner { login }
+  description
+  url
+  diskUsage
+  createdAt
+  updatedAt
+  pushedAt
+  stargazerCount
+  forkCount
+  languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+    edges { size node { name } }
+  }
+  repositoryTopics(first: 100) {
+    nodes { topic { name } }
+  }
+  readmeMd: object(expression: "HEAD:README.md") { ... on Blob { text } }
+  readmeLowerMd: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+  readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { text } }
+  readmePlain: object(expression: "HEAD:README") { ... on Blob { text } }
+  defaultBranchRef {
+    target { ... on Commit { history { totalCount } } }
+  }
+}
+"""
+
+def github_graphql(query, variables=None):
+    """POST a GraphQL query and return its data, tolerating per-repository errors"""
+    response = graphql_rate_limiter.send(
+        "POST",
+        GITHUB_GRAPHQL_URL,
+        headers=github_headers(),
+        json={"query": query, "variables": variables or {}}
+    )
+    response.raise_for_status()
+    payload = response.json()
+    
+    if payload.get("errors"):
+        messages = "; ".join(error.get("message", str(error)) for error in payload["errors"])
+        if not payload.get("data"):
+            raise RuntimeError(f"GraphQL query failed: {messages}")
+        print(f"  Warning: GraphQL query returned errors: {messages}")
+    
+    return payload.get("data") or {}
+
+def graphql_node_to_repo_details(node):
+    """Convert a GraphQL repository node into the repo details dict"""
+    languages_data = {edge["node"]["name"]: edge["size"] for edge in node["languages"]["edges"]}
+    
+    readme_content = ""
+    for alias in ("readmeMd", "readmeLowerMd", "readmeRst", "readmePlain"):
+        blob = node.get(alias)
+        if blob and blob.get("text"):
+            readme_content = blob["text"]
+            break
+    
+    # Empty repositories have no default branch
+    branch = node.get("defaultBranchRef")
+    commit_count = branch["target"]["history"]["totalCount"] if branch else 0
+    
+    repo_data = {
+        "name": node["name"],
+        "owner": node["owner"],
+        "description": node["description"],
+        "html_url": node["url"],
+        "created_at": node["createdAt"],
+        "updated_at": node["updatedAt"],
+        "pushed_at": node["pushedAt"],
+        "stargazers_count": node["stargazerCount"],
+        "forks_count": node["forkCount"],
+        "size": node.get("diskUsage"),
+        "topics": [topic_node["topic"]["name"] for topic_node in node["repositoryTopics"]["nodes"]]
+    }
+    return build_repo_details(repo_data, languages_data, readme_content, commit_count)
+
+def fetch_repo_details_graphql(repo_names, owner=GITHUB_USERNAME):
+    """Fetch details for many repositories in a single GraphQL query"""
+    variable_defs = ", ".join(["$owner: String!"] + [f"$name{i}: String!" for i in range(len(repo_names))])
+    selections = "\n".join(
+        f"  repo{i}: repository(owner: $owner, name: $name{i}) {{ ...RepoDetails }}"
+        for i in range(len(repo_names))
+    )
+    query = f"query({variable_defs}) {{\n{selections}\n}}\n{GRAPHQL_REPO_FRAGMENT}"
+    
+    variables = {"owner": owner}
+    variables.update({f"name{i}": name for i, name in enumerate(repo_names)})
+    data = github_graphql(query, variables)
+    
+    details = {}
+    for i, name in enumerate(repo_names):
+        node = data.get(f"repo{i}")
+        if node:
+            details[name] = graphql_node_to_repo_details(node)
+    return details
+
+class GraphQLBatchFetcher:
+    """Per-repository fetcher that loads details lazily, one GraphQL batch at a time"""
+    
+    def __init__(self, repo_refs, batch_size=GRAPHQL_BATCH_SIZE):
+        # Each query targets a single owner, so batches are formed per owner
+        names_by_owner = {}
+        for owner, name in repo_refs:
+            names_by_owner.setdefault(owner, []).append(name)
+        
+        self._batches = [
+            (owner, names[i:i + batch_size])
+            for owner, names in names_by_owner.items()
+            for i in range(0, len(names), batch_size)
+        ]
+        self._batch_index = {(owner, name): i for i, (owner, names) in enumerate(self._batches) for name in names}
+        self._batch_locks = [threading.Lock() for _ in self._batches]
+        self._batch_errors = {}
+        self._details = {}
+    
+    def __call__(self, repo_name, owner=GITHUB_USERNAME):
+        key = (owner, repo_name)
+        batch = self._batch_index[key]
+        with self._batch_locks[batch]:
+            # A failed query is not retried for each repository of its batch
+            if batch in self._batch_errors:
+                raise self._batch_errors[batch]
+            if key not in self._details:
+                batch_owner, batch_names = self._batches[batch]
+                try:
+                    fetched = fetch_repo_details_graphql(batch_names, batch_owner)
+                except Exception as e:
+                    self._batch_errors[batch] = e
+                    raise
+                # Repositories missing from the response are stored as None so they fail without a refetch
+                self._details.update({(batch_owner, name): fetched.get(name) for name in batch_names})
+        if self._details[key] is None:
+            raise ValueError(f"No GraphQL data returned for {owner}/{repo_name}")
+        return self._details[key]
+
+# File extensions counted towards each language when reading local git trees
+EXTENSION_LANGUAGES = {
+    ".py": "Python", ".pyi": "Python", ".ipynb": "Jupyter Notebook",
+    ".js": "JavaScript", ".mjs": "JavaScript", ".cjs": "JavaScript", ".jsx": "JavaScript",
+    ".ts": "TypeScript", ".tsx": "TypeScript", ".vue": "Vue", ".svelte": "Svelte",
+    ".html": "HTML", ".htm": "HTML", ".css": "CSS", ".scss": "SCSS", ".sass": "Sass", ".less": "Less",
+    ".c": "C", ".h": "C", ".cc": "C++", ".cpp": "C++", ".cxx": "C++", ".hpp": "C++", ".hh": "C++",
+    ".cs": "C#", ".java": "Java", ".kt": "Kotlin", ".kts": "Kotlin", ".scala": "Scala", ".groovy": "Groovy",
+    ".go": "Go", ".rs": "Rust", ".swift": "Swift", ".m": "Objective-C", ".mm": "Objective-C++",
+    ".rb": "Ruby", ".php": "PHP", ".pl": "Perl", ".pm": "Perl", ".lua": "Lua", ".r": "R",
+    ".dart": "Dart", ".ex": "Elixir", ".exs": "Elixir", ".erl": "Erlang", ".hs": "Haskell",
+    ".clj": "Clojure", ".ml": "OCaml", ".fs": "F#", ".jl": "Julia", ".zig": "Zig", ".nim": "Nim",
+    ".sh": "Shell", ".bash": "Shell", ".zsh": "Shell", ".fish": "Shell", ".ps1": "PowerShell",
+    ".bat": "Batchfile", ".cmd": "Batchfile", ".asm": "Assembly", ".s": "Assembly",
+    ".sql": "SQL", ".tex": "TeX", ".nix": "Nix", ".tf": "HCL", ".hcl": "HCL",
+    ".vim": "Vim Script", ".el": "Emacs Lisp", ".sol": "Solidity", ".cu": "Cuda",
+}
+
+# Files identified by name rather than extension
+FILENAME_LANGUAGES = {
+    "Dockerfile": "Dockerfile",
+    "Makefile": "Makefile",
+    "CMakeLists.txt": "CMake",
+}
+
+def run_git(repo_path, *args):
+    """Run a git command against a local repository and return its output"""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+def is_git_repository(path):
+    """Return whether the directory is a bare repository or a working tree"""
+    return (path / ".git").exists() or ((path / "HEAD").is_file() and (path / "objects").is_dir())
+
+def local_repos_dir(owner=GITHUB_USERNAME):
+    """Return the mirror directory for an owner: LOCAL_REPOS_DIR/<owner> if present, else LOCAL_REPOS_DIR"""
+    owner_dir = Path(LOCAL_REPOS_DIR) / owner
+    if owner_dir.is_dir() and not is_git_repository(owner_dir):
+        return owner_dir
+    return Path(LOCAL_REPOS_DIR)
+
+def find_local_repository(repo_name, owner=GITHUB_USERNAME):
+    """Return the path of the local mirror of a repository, or None if there is none"""
+    repos_dir = local_repos_dir(owner)
+    for candidate in (repos_dir / f"{repo_name}.git", repos_dir / repo_name):
+        if candidate.is_dir() and is_git_repository(candidate):
+            return candidate
+    return None
+
+def local_tip_time(repo_path):
+    """Return the unix time of the HEAD commit, or the directory's mtime for an empty repository"""
+    try:
+        return int(run_git(repo_path, "log", "-1", "--format=%ct", "HEAD").strip())
+    except (subprocess.CalledProcessError, ValueError):
+        return int(repo_path.stat().st_mtime)
+
+def list_local_repositories(owner=GITHUB_USERNAME):
+    """List the repositories mirrored for an owner without calling the API
+    
+    Repositories are ordered by their latest commit, newest first, like the
+    API listing sorted by update time.
+    """
+    repos_dir = local_repos_dir(owner)
+    repos = []
+    for path in sorted(repos_dir.iterdir()):
+        if path.is_dir() and is_git_repository(path):
+            name = path.name[:-len(".git")] if path.name.endswith(".git") else path.name
+            # Mirrors carry no listing metadata, so only the name filter applies
+            if REPO_NAME_PATTERN and not REPO_NAME_PATTERN.search(name):
+                continue
+            repos.append({"name": name, "owner": {"login": owner}, "fork": False,
+                          "updated_at": git_timestamp(local_tip_time(path))})
+    
+    repos.sort(key=lambda repo: repo["updated_at"], reverse=True)
+    print(f"Found {len(repos)} local repositories in {repos_dir}.")
+    return repos
+
+def clone_missing_repositories(repos, target=GITHUB_USERNAME):
+    """Bare-clone any listed repository that has no local mirror yet
+    
+    Mirrors are looked up and cloned under the repository's own owner, so
+    repositories of other accounts in member or all listings are found again
+    by the fetch step. The token is passed as an HTTP header through the
+    environment, keeping it out of the process list and the clone's config.
+    """
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    if GITHUB_TOKEN:
+        credentials = base64.b64encode(f"x-access-token:{GITHUB_TOKEN}".encode()).decode()
+        env.update({
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.extraheader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        })
+    
+    for repo in repos:
+        owner = repo_owner(repo)
+        if find_local_repository(repo["name"], owner):
+            continue
+        
+        # Several targets, and other owners' repositories, share LOCAL_REPOS_DIR through one
+        # subdirectory per owner, which local_repos_dir() then picks up
+        repos_dir = local_repos_dir(owner)
+        if repos_dir == Path(LOCAL_REPOS_DIR) and (len(GITHUB_TARGETS) > 1 or owner != target):
+            repos_dir = repos_dir / owner
+        repos_dir.mkdir(parents=True, exist_ok=True)
+        
+        print(f"Cloning {owner}/{repo['name']} into {repos_dir}...")
+        try:
+            # Full blobs are needed for the language byte counts, so the clone is not blobless
+            subprocess.run(
+                ["git", "clone", "--bare", "--single-branch", "--quiet",
+                 repo["clone_url"], str(repos_dir / f"{repo['name']}.git")],
+                capture_output=True, text=True, check=True, env=env
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"  Warning: Could not clone {repo['name']}: {e.stderr.strip()}")
+
+def git_timestamp(unix_time):
+    """Format a unix commit time like the GitHub API timestamps"""
+    return datetime.fromtimestamp(int(unix_time), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def local_languages(repo_path):
+    """Sum blob sizes at HEAD per language, keyed by file extension"""
+    languages = {}
+    for line in run_git(repo_path, "ls-tree", "-r", "-l", "HEAD").splitlines():
+        # Format: <mode> <type> <object> <size>\t<path>
+        meta, _, file_path = line.partition("\t")
+        parts = meta.split()
+        if len(parts) != 4 or parts[1] != "blob" or not parts[3].isdigit():
+            continue
+        
+        file_name = file_path.rsplit("/", 1)[-1]
+        language = FILENAME_LANGUAGES.get(file_name) or EXTENSION_LANGUAGES.get(os.path.splitext(file_name)[1].lower())
+        if language:
+            languages[language] = languages.get(language, 0) + int(parts[3])
+    
+    return dict(sorted(languages.items(), key=lambda item: item[1], reverse=True))
+
+def local_readme(repo_path):
+    """Return the README at the root of HEAD, or an empty string if there is none"""
+    for file_name in run_git(repo_path, "ls-tree", "--name-only", "HEAD").splitlines():
+        if re.fullmatch(r"readme(\.(md|markdown|rst|txt))?", file_name, flags=re.IGNORECASE):
+            return run_git(repo_path, "show", f"HEAD:{file_name}")
+    return ""
+
+def local_description(repo_path):
+    """Return the repository description file contents, ignoring git's placeholder text"""
+    for description_path in (repo_path / "description", repo_path / ".git" / "description"):
+        if description_path.is_file():
+            description = description_path.read_text().strip()
+            if not description.startswith("Unnamed repository"):
+                return description
+    return ""
+
+def local_repo_url(repo_path, repo_name, owner=GITHUB_USERNAME):
+    """Return the GitHub web URL of a local repository, derived from its origin remote if possible"""
+    try:
+        remote = run_git(repo_path, "config", "--get", "remote.origin.url").strip()
+    except subprocess.CalledProcessError:
+        remote = ""
+    match = re.search(r"github\.com[:/](.+?)(?:\.git)?/?$", remote)
+    if match:
+        return f"https://github.com/{match.group(1)}"
+    return f"https://github.com/{owner}/{repo_name}"
+
+def fetch_repo_details_local(repo_name, owner=GITHUB_USERNAME):
+    """Build repository details from a local git mirror using git plumbing commands
+    
+    Stars and forks are not stored in git, so they are reported as 0.
+    """
+    repo_path = find_local_repository(repo_name, owner)
+    if repo_path is None:
+        raise FileNotFoundError(f"No local repository for {repo_name} in {local_repos_dir(owner)}")
+    
+    try:
+        commit_count = int(run_git(repo_path, "rev-list", "--count", "HEAD"))
+        updated_at = git_timestamp(run_git(repo_path, "log", "-1", "--format=%ct", "HEAD").strip())
+        root_times = run_git(repo_path, "log", "--max-parents=0", "--format=%ct", "HEAD").split()
+        created_at = git_timestamp(min(root_times, key=int))
+        languages_data = local_languages(repo_path)
+        readme_content = local_readme(repo_path)
+    except subprocess.CalledProcessError:
+        # Empty repositories have no HEAD commit
+        commit_count, languages_data, readme_content = 0, {}, ""
+        created_at = updated_at = git_timestamp(repo_path.stat().st_mtime)
+    
+    repo_data = {
+        "name": repo_name,
+        "owner": {"login": owner},
+        "description": local_description(repo_path),
+        "html_url": local_repo_url(repo_path, repo_name, owner),
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "pushed_at": updated_at,
+        "stargazers_count": 0,
+        "forks_count": 0,
+        "topics": []
+    }
+    return build_repo_details(repo_data, languages_data, readme_content, commit_count)
+
+class LocalRepoFetcher:
+    """Per-repository fetcher that reads all local mirrors up front in a process pool"""
+    
+    def __init__(self, repo_refs, max_workers=LOCAL_WORKERS):
+        self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        self._futures = {
+            (owner, name): self._pool.submit(fetch_repo_details_local, name, owner)
+            for owner, name in repo_refs
+        }
+    
+    def __call__(self, repo_name, owner=GITHUB_USERNAME):
+        return self._futures[(owner, repo_name)].result()
+    
+    def close(self):
+        """Shut down the worker processes, cancelling reads that have not started"""
+        for future in self._futures.values():
+            future.cancel()
+        self._pool.shutdown(wait=True)
+
+def repo_owner(repo):
+    """Return the owner login of a listed repository"""
+    return repo.get("owner", {}).get("login") or GITHUB_USERNAME
+
+def listing_full_name(repo):
+    """Return owner/name for a listed repository, which stays unique when listings mix owners"""
+    return f"{repo_owner(repo)}/{repo['name']}"
+
+def get_repo_details_fetcher(repos):
+    """Return the function used to fetch a single repository's details, called as fetch(name, owner)"""
+    repo_refs = [(repo_owner(repo), repo["name"]) for repo in repos]
+    if DATA_SOURCE == "graphql":
+        return GraphQLBatchFetcher(repo_refs)
+    if DATA_SOURCE == "local":
+        return LocalRepoFetcher(repo_refs)
+    
+    # REST fetches reuse the listing objects instead of requesting each repository again
+    listings = {(repo_owner(repo), repo["name"]): repo for repo in repos}
+    fetch_rest = fetch_repo_details_concurrently if ASYNC_FETCH else fetch_repo_details
+    return lambda repo_name, owner: fetch_rest(repo_name, owner, listings.get((owner, repo_name)))
+
+# README headings ranked by how much they say about what a project is; unlisted headings score 1
+README_SECTION_SCORES = [
+    (re.compile(r"about|overview|introduction|description|summary|what|why|features|highlights|how it works", re.I), 3),
+    (re.compile(r"usage|example|demo|architecture|design", re.I), 2),
+    (re.compile(r"install|setup|requirement|prerequisite|getting started|build|compil|deploy|configur"
+                r"|contribut|licen[cs]e|changelog|acknowledg|credit|sponsor|support|contents|faq|test", re.I), 0),
+]
+
+class TokenCounter:
+    """Counts and truncates text in LLM tokens with a local tokenizer, or estimates them"""
+    
+    def __init__(self, spec):
+        self.encode = None
+        self.decode = None
+        if not spec:
+            return
+        try:
+            if spec.endswith(".json"):
+                from tokenizers import Tokenizer
+                tokenizer = Tokenizer.from_file(os.path.expanduser(spec))
+                self.encode = lambda text: tokenizer.encode(text, add_special_tokens=False).ids
+                self.decode = tokenizer.decode
+            else:
+                import tiktoken
+                encoding = tiktoken.get_encoding(spec)
+                self.encode = lambda text: encoding.encode(text, disallowed_special=())
+                self.decode = encoding.decode
+        except Exception as e:
+            print(f"Warning: Could not load tokenizer {spec} ({e}); estimating token counts instead.")
+    
+    def count(self, text):
+        if self.encode:
+            return len(self.encode(text))
+        return (len(text) + 3) // 4
+    
+    def truncate(self, text, max_tokens):
+        """Cut text to at most max_tokens tokens, at a word boundary where possible"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        cut = self.decode(self.encode(text)[:max_tokens]) if self.encode else text[:max_tokens * 4]
+        if " " in cut:
+            cut = cut[:cut.rindex(" ")]
+        return cut.rstrip() + "..."
+
+token_counter = TokenCounter(TOKENIZER)
+
+def count_tokens(text):
+    """Return the number of LLM tokens in a piece of text"""
+    return token_counter.count(text)
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens tokens"""
+    return token_counter.truncate(text, max_tokens)
+
+def clean_readme(readme):
+    """Strip badges, images, HTML, code blocks and link targets from a README"""
+    text = re.sub(r"<!--.*?-->", "", readme, flags=re.S)
+    text = re.sub(r"^\s*(```|~~~).*?^\s*\1[^\n]*$", "", text, flags=re.S | re.M)
+    text = re.sub(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)", "", text)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"^\s*\[[^\]]+\]:\s*\S+.*$", "", text, flags=re.M)
+    text = re.sub(r"[ \t]+$", "", html.unescape(text), flags=re.M)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def rank_readme_section(heading, position):
+    """Score a README section by its heading; the opening section is the introduction and ranks highest"""
+    if position == 0:
+        return 4
+    for pattern, score in README_SECTION_SCORES:
+        if pattern.search(heading):
+            return score
+    return 1
+
+def condense_readme(readme, budget=README_TOKEN_BUDGET):
+    """Reduce a README to its most descriptive sections within a token budget
+    
+    Sections are taken in rank order until the budget is spent, the last one
+    truncated to fit, and then put back in their original order.
+    """
+    text = clean_readme(readme)
+    if count_tokens(text) <= budget:
+        return text
+    
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        match = re.match(r"#{1,6}\s+(.*)", line)
+        if match:
+            if heading or "".join(lines).strip():
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    sections.append((heading, "\n".join(lines).strip()))
+    
+    ranked = sorted(range(len(sections)), key=lambda i: -rank_readme_section(sections[i][0], i))
+    kept = {}
+    remaining = budget
+    for i in ranked:
+        heading, body = sections[i]
+        if not body or remaining <= 0:
+            continue
+        section = f"{heading}:\n{body}" if heading else body
+        if count_tokens(section) > remaining:
+            # A sliver of a section says nothing, so leave room for smaller ones instead
+            if remaining < 16:
+                continue
+            section = truncate_to_tokens(section, remaining)
+        kept[i] = section
+        remaining -= count_tokens(section) + 1
+    
+    return "\n\n".join(kept[i] for i in sorted(kept))
+
+def fit_repo_text(repo_details, render, budget=PROMPT_TOKEN_BUDGET):
+    """Return a repository's description and README excerpt sized to a prompt token budget
+    
+    render(description, readme) produces the prompt text around them. The
+    README excerpt is shortened first, to the room the rest of the prompt and
+    the description leave; the description is only cut when even that does
+    not fit, and then the excerpt is dropped.
+    """
+    description = repo_details['description']
+    readme_budget = README_TOKEN_BUDGET
+    if budget:
+        remaining = max(0, budget - count_tokens(render("", "")))
+        description = truncate_to_tokens(description, remaining)
+        readme_budget = min(readme_budget, max(0, remaining - count_tokens(description)))
+    return description, condense_readme(repo_details['readme'], readme_budget)
+
+def build_repo_prompt(repo_details):
+    """Build the LLM prompt describing a repository, within PROMPT_TOKEN_BUDGET"""
+    def render(description, readme):
+        return f"""
     As a technical writer, create a concise and informative summary of this GitHub repository:
     
     Repository Name: {repo_details['name']}
-    Description: {repo_details['description']}
+    Description: {description}
     Languages: {', '.join(repo_details['languages'].keys())}
     Stars: {repo_details['stars']}
     Forks: {repo_details['forks']}
@@ -149,16 +1152,388 @@ def generate_repo_summary(repo_details):
     Topics: {', '.join(repo_details['topics'])}
     
     README Content:
-    {repo_details['readme'][:1000] if len(repo_details['readme']) > 1000 else repo_details['readme']}
+    {readme}
     
     Write a 2-3 paragraph summary that explains what this project does, its key features, and its technological significance.
     Focus on the purpose, technologies used, and any notable aspects.
     """
     
-    headers = {
-        "Content-Type": "application/json"
-    }
+    return render(*fit_repo_text(repo_details, render))
+
+class SummaryCache:
+    """Content-addressed on-disk cache of LLM summaries with size-bounded LRU eviction"""
+    
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        # Running estimate of the cache size, measured by the first eviction pass
+        self._total_bytes = None
+        self._lock = threading.Lock()
+    
+    def key(self, prompt):
+        # The same prompt sent to a different model must not share an entry. Every endpoint in the
+        # pool serves the same model, so the pool only stands in for it when LLM_MODEL is unset,
+        # and then in sorted order so reordering the endpoints keeps the cache
+        model = LLM_MODEL or ",".join(sorted(API_ENDPOINTS))
+        identity = json.dumps([model, prompt])
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+    
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.txt"
+    
+    def get(self, prompt):
+        path = self._path(self.key(prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                summary = f.read()
+            # Touch the entry so eviction treats it as recently used
+            os.utime(path)
+            return summary
+        except OSError:
+            return None
+    
+    def put(self, prompt, summary):
+        path = self._path(self.key(prompt))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(summary)
+        replace_with_temp_file(tmp_path, path)
+        
+        # The directory is only scanned on the first write and whenever the running total
+        # goes over the cap, rather than on every write
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(summary.encode("utf-8"))
+                if self._total_bytes <= self.max_bytes:
+                    return
+        self.evict()
+    
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes
+        
+        Eviction goes down to 90% of max_bytes, so the next scan only comes
+        after another 10% of max_bytes has been written.
+        """
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*/*.txt"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                self._total_bytes = total
+                return
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                total -= size
+            self._total_bytes = total
+
+summary_cache = SummaryCache(LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES) if LLM_CACHE else None
+
+class ThinkBlockFilter:
+    """Incrementally drop <think>...</think> spans from text that arrives in chunks"""
+    
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+    
+    def __init__(self):
+        self._buffer = ""
+        self._in_think = False
+    
+    def _partial_tag_length(self, tag):
+        # Length of the longest buffer suffix that could be the start of a tag split across chunks
+        for length in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+            if self._buffer.endswith(tag[:length]):
+                return length
+        return 0
+    
+    def feed(self, text):
+        """Add a chunk and return the visible text that is now safe to emit"""
+        self._buffer += text
+        visible = []
+        
+        while True:
+            tag = self.CLOSE_TAG if self._in_think else self.OPEN_TAG
+            index = self._buffer.find(tag)
+            if index == -1:
+                keep = self._partial_tag_length(tag)
+                if not self._in_think:
+                    visible.append(self._buffer[:len(self._buffer) - keep])
+                self._buffer = self._buffer[len(self._buffer) - keep:]
+                break
+            
+            if not self._in_think:
+                visible.append(self._buffer[:index])
+            self._buffer = self._buffer[index + len(tag):]
+            self._in_think = not self._in_think
+        
+        return "".join(visible)
+    
+    def flush(self):
+        """Return any held-back visible text once the stream has ended"""
+        remaining = "" if self._in_think else self._buffer
+        self._buffer = ""
+        return remaining
+
+class TokenUsage:
+    """Thread-safe running totals of LLM requests, tokens and time for the end-of-run report"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, prompt, content, usage, seconds):
+        """Add one completion, preferring the server's reported usage over local counts"""
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or count_tokens(prompt)
+        completion_tokens = usage.get("completion_tokens") or count_tokens(content or "")
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.seconds += seconds
+    
+    def report(self):
+        if not self.requests:
+            return "LLM token usage: no completions received."
+        rate = self.completion_tokens / self.seconds if self.seconds else 0.0
+        return (f"LLM token usage: {self.requests} requests, {self.prompt_tokens} prompt tokens "
+                f"({self.prompt_tokens // self.requests} per request), {self.completion_tokens} completion tokens, "
+                f"{rate:.1f} completion tokens/s per request.")
+
+token_usage = TokenUsage()
+
+class LLMEndpoint:
+    """One inference server in the endpoint pool, with its circuit breaker state"""
+    
+    def __init__(self, url, cap):
+        self.url = url
+        self.cap = cap
+        self.outstanding = 0
+        self.served = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.next_check = 0.0
+
+def is_endpoint_failure(error):
+    """Return True if an LLM request error means the endpoint itself is down or overloaded"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+def backoff_delay(error, attempt):
+    """Return a full-jitter exponential backoff delay, at least any Retry-After the server sent"""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay
+
+class LLMEndpointPool:
+    """Dispatches LLM requests over several endpoints
+    
+    Each request goes to the healthy endpoint with the fewest requests in
+    flight, waiting while every endpoint is at its concurrency cap. Failed
+    requests are retried with jittered exponential backoff, on another
+    endpoint if one is free. After LLM_BREAKER_THRESHOLD consecutive failures
+    an endpoint's circuit opens: it leaves the rotation until a health check
+    succeeds, tried every LLM_HEALTH_INTERVAL seconds, and dispatch pauses
+    while every circuit is open.
+    """
+    
+    def __init__(self, urls, caps, default_cap=LLM_CONCURRENCY):
+        self.endpoints = [LLMEndpoint(url, caps[i] if i < len(caps) else default_cap) for i, url in enumerate(urls)]
+        self._condition = threading.Condition()
+    
+    def health_check(self, endpoint):
+        """Probe an endpoint's model list (or the URL itself); any non-5xx answer means it is up"""
+        health_url = re.sub(r"/chat/completions/?$", "/models", endpoint.url)
+        try:
+            return llm_session.get(health_url, timeout=LLM_CONNECT_TIMEOUT).status_code < 500
+        except requests.RequestException:
+            return False
+    
+    def _probe_due(self):
+        now = time.monotonic()
+        with self._condition:
+            due = [endpoint for endpoint in self.endpoints if not endpoint.healthy and endpoint.next_check <= now]
+            for endpoint in due:
+                endpoint.next_check = now + LLM_HEALTH_INTERVAL
+        
+        for endpoint in due:
+            if self.health_check(endpoint):
+                print(f"LLM endpoint {endpoint.url} is healthy again.")
+                with self._condition:
+                    endpoint.healthy = True
+                    endpoint.consecutive_failures = 0
+                    self._condition.notify_all()
+    
+    def acquire(self, avoid=None):
+        """Reserve the least busy healthy endpoint, preferring one other than avoid
+        
+        While every circuit is open this pauses until the next health check,
+        and returns None if that check fails too.
+        """
+        resume_at = None
+        while True:
+            self._probe_due()
+            with self._condition:
+                healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+                if not healthy:
+                    now = time.monotonic()
+                    if resume_at is None:
+                        resume_at = min(endpoint.next_check for endpoint in self.endpoints)
+                        print(f"  All LLM endpoints are failing; pausing dispatch for up to {max(resume_at - now, 0):.0f}s.")
+                    elif now >= resume_at:
+                        return None
+                    self._condition.wait(max(resume_at - now, 0.01))
+                    continue
+                available = [endpoint for endpoint in healthy if endpoint.outstanding < endpoint.cap]
+                if available:
+                    endpoint = min(available, key=lambda endpoint: (endpoint is avoid, endpoint.outstanding, endpoint.served))
+                    endpoint.outstanding += 1
+                    return endpoint
+                self._condition.wait()
+    
+    def has_alternative(self, endpoint):
+        """Return True if another healthy endpoint could take a retry straight away"""
+        with self._condition:
+            return any(other.healthy and other.outstanding < other.cap for other in self.endpoints if other is not endpoint)
+    
+    def release(self, endpoint, ok):
+        with self._condition:
+            endpoint.outstanding -= 1
+            endpoint.served += 1
+            if ok:
+                endpoint.consecutive_failures = 0
+            else:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.healthy and endpoint.consecutive_failures >= LLM_BREAKER_THRESHOLD:
+                    print(f"  Circuit open for LLM endpoint {endpoint.url} after {endpoint.consecutive_failures} "
+                          f"consecutive failures; health-checking it again in {LLM_HEALTH_INTERVAL:g}s.")
+                    endpoint.healthy = False
+                    endpoint.next_check = time.monotonic() + LLM_HEALTH_INTERVAL
+            self._condition.notify_all()
+    
+    def call(self, func, label):
+        """Run func(url) on the pool, retrying endpoint failures up to LLM_RETRIES times"""
+        endpoint = None
+        last_error = None
+        for attempt in range(LLM_RETRIES + 1):
+            endpoint = self.acquire(avoid=endpoint)
+            if endpoint is None:
+                break
+            try:
+                result = func(endpoint.url)
+            except Exception as e:
+                failed = is_endpoint_failure(e)
+                self.release(endpoint, ok=not failed)
+                if not failed or attempt >= LLM_RETRIES:
+                    raise
+                # Fail over at once when another endpoint is free, otherwise back off first
+                delay = 0.0 if self.has_alternative(endpoint) else backoff_delay(e, attempt)
+                print(f"  Warning: LLM endpoint {endpoint.url} failed for {label} ({e}); "
+                      f"retry {attempt + 1}/{LLM_RETRIES} in {delay:.1f}s.")
+                time.sleep(delay)
+                last_error = e
+                continue
+            self.release(endpoint, ok=True)
+            return result
+        raise last_error or RuntimeError("No healthy LLM endpoint is available.")
+    
+    def report(self):
+        return "\n".join(f"LLM endpoint {endpoint.url}: {endpoint.served} requests, {endpoint.failures} failures."
+                         for endpoint in self.endpoints)
+
+llm_pool = LLMEndpointPool(API_ENDPOINTS, LLM_ENDPOINT_CONCURRENCY)
+
+def request_completion(data, repo_name, url=API_ENDPOINTS[0]):
+    """POST a completion request and return the raw message content, whether the server cut it off
+    at max_tokens, and the reported token usage"""
+    response = llm_session.post(url, headers={"Content-Type": "application/json"}, json=data, timeout=LLM_TIMEOUTS)
+    response.raise_for_status()
+    response_json = response.json()
+    
+    if "choices" not in response_json or len(response_json["choices"]) == 0:
+        print(f"No content found in API response for {repo_name}.")
+        return None, False, response_json.get("usage")
+    
+    choice = response_json["choices"][0]
+    return choice["message"]["content"], choice.get("finish_reason") == "length", response_json.get("usage")
+
+def stream_completion(data, repo_name, url=API_ENDPOINTS[0]):
+    """Stream a completion over server-sent events, discarding thinking output as it arrives
+    
+    Returns the visible content, whether the stream was cut off by
+    LLM_MAX_TOKENS or LLM_MAX_LATENCY, and the token usage.
+    """
+    think_filter = ThinkBlockFilter()
+    visible = []
+    tokens = 0
+    usage = None
+    truncated = False
+    started = time.monotonic()
+    
+    with llm_session.post(url, headers={"Content-Type": "application/json"},
+                          json=dict(data, stream=True), stream=True, timeout=LLM_TIMEOUTS) as response:
+        response.raise_for_status()
+        
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            
+            event = json.loads(payload)
+            # Servers that report usage when streaming send it with the final event
+            usage = event.get("usage") or usage
+            choices = event.get("choices") or []
+            if choices:
+                delta = choices[0].get("delta") or {}
+                chunk = delta.get("content") or choices[0].get("text") or ""
+                if chunk:
+                    tokens += 1
+                    visible.append(think_filter.feed(chunk))
+                # The server stopping at max_tokens is a cut-off too
+                if choices[0].get("finish_reason") == "length":
+                    truncated = True
+            
+            # Each event carries roughly one token; thinking output counts towards the limits too
+            if LLM_MAX_TOKENS and tokens >= LLM_MAX_TOKENS:
+                print(f"  Warning: Stopping {repo_name} summary after {tokens} tokens.")
+                truncated = True
+                break
+            if LLM_MAX_LATENCY and time.monotonic() - started > LLM_MAX_LATENCY:
+                print(f"  Warning: Stopping {repo_name} summary after {LLM_MAX_LATENCY:g}s.")
+                truncated = True
+                break
+    
+    visible.append(think_filter.flush())
+    return "".join(visible), truncated, usage or {"completion_tokens": tokens}
+
+def complete_prompt(prompt, label):
+    """Send a prompt to the LLM and return the cleaned response text
     
+    Returns the text (None if the response had no content) and whether it
+    was cut off early, by the streaming limits or by the server stopping at max_tokens.
+    """
     data = {
         "messages": [
             {
@@ -168,146 +1543,990 @@ def generate_repo_summary(repo_details):
         ],
         "mode": "instruct"
     }
+    if LLM_MODEL:
+        data["model"] = LLM_MODEL
+    if LLM_MAX_TOKENS:
+        data["max_tokens"] = LLM_MAX_TOKENS
+    
+    started = time.monotonic()
+    if LLM_STREAM:
+        content, truncated, usage = llm_pool.call(lambda url: stream_completion(data, label, url), label)
+    else:
+        content, truncated, usage = llm_pool.call(lambda url: request_completion(data, label, url), label)
+    token_usage.record(prompt, content, usage, time.monotonic() - started)
+    if content is None:
+        return None, truncated
+    
+    # Remove thinking tokens if present
+    # Pattern for <think>...</think> or other similar thinking tokens
+    content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
+    content = re.sub(r'\*\*<think>\*\*.*?\*\*</think>\*\*', '', content, flags=re.DOTALL)
+    content = content.strip()
+    
+    if not content:
+        print(f"No content found in API response for {label}.")
+        return None, truncated
+    return content, truncated
+
+def generate_repo_summary(repo_details):
+    """Generate a summary of the repository using the LLM
+    
+    Returns the summary (None on failure) and whether it was cut off early.
+    """
+    
+    # Create a prompt for the LLM
+    prompt = build_repo_prompt(repo_details)
+    
+    if summary_cache and not FORCE_REFRESH:
+        cached_summary = summary_cache.get(prompt)
+        if cached_summary:
+            print(f"Using cached LLM summary for {repo_details['name']}.")
+            return cached_summary, False
     
     try:
-        response = requests.post(API_ENDPOINT, headers=headers, json=data)
-        response.raise_for_status()
-        response_json = response.json()
-        
-        if "choices" not in response_json or len(response_json["choices"]) == 0:
-            print(f"No content found in API response for {repo_details['name']}.")
-            return None
-            
-        content = response_json["choices"][0]["message"]["content"]
+        content, truncated = complete_prompt(prompt, repo_details["name"])
         
-        # Remove thinking tokens if present
-        # Pattern for <think>...</think> or other similar thinking tokens
-        content = re.sub(r'<think>.*?</think>', '', content, flags=re.DOTALL)
-        content = re.sub(r'\*\*<think>\*\*.*?\*\*</think>\*\*', '', content, flags=re.DOTALL)
-        
-        return content.strip()
+        # Cut-off output is still used for this run but never cached
+        if summary_cache and content and not truncated:
+            summary_cache.put(prompt, content)
+        return content, truncated
         
     except Exception as e:
         print(f"Error generating summary for {repo_details['name']}: {e}")
-        return None
+        return None, False
 
-def create_markdown_summary(repos_data):
-    """Create a comprehensive markdown summary of all repositories"""
+def repo_full_name(repo_details):
+    """Return "owner/name", which stays unique when several targets share one LLM queue"""
+    return f"{repo_details['owner']}/{repo_details['name']}"
+
+def build_batch_prompt(repos_details):
+    """Build one LLM prompt asking for summaries of several repositories as a JSON array
+    
+    Repositories are named owner/name so same-named repositories of different
+    targets cannot be confused. PROMPT_TOKEN_BUDGET applies to each section.
+    """
+    sections = []
+    for i, repo_details in enumerate(repos_details, 1):
+        def render(description, readme):
+            return f"""
+    Repository {i}
+    Repository Name: {repo_full_name(repo_details)}
+    Description: {description}
+    Languages: {', '.join(repo_details['languages'].keys())}
+    Stars: {repo_details['stars']}
+    Forks: {repo_details['forks']}
+    Created: {repo_details['created_at']}
+    Last Updated: {repo_details['updated_at']}
+    Commit Count: {repo_details['commit_count']}
+    Topics: {', '.join(repo_details['topics'])}
     
-    timestamp = datetime.now().strftime("%Y-%m-%d")
-    markdown = f"""# GitHub Repository Summary
+    README Content:
+    {readme}
+    """
+        
+        sections.append(render(*fit_repo_text(repo_details, render)))
+    
+    return f"""
+    As a technical writer, create a concise and informative summary of each of these {len(repos_details)} GitHub repositories.
+    For each one, write a 2-3 paragraph summary that explains what the project does, its key features, and its technological significance.
+    Focus on the purpose, technologies used, and any notable aspects.
+    {''.join(sections)}
+    Respond with only a JSON array containing one object per repository, in the same order, of the form:
+    [{{"name": "<owner/name as given above>", "summary": "<summary>"}}]
+    """
 
-*Generated on {timestamp}*
+def parse_batch_summaries(content, repos_details):
+    """Map positions in repos_details to summaries from a JSON array response, ignoring malformed entries"""
+    match = re.search(r'\[.*\]', content, flags=re.DOTALL)
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+    
+    positions = {repo_full_name(repo_details).lower(): i for i, repo_details in enumerate(repos_details)}
+    summaries = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name, summary = item.get("name"), item.get("summary")
+        if isinstance(name, str) and name.lower() in positions and isinstance(summary, str) and summary.strip():
+            summaries[positions[name.lower()]] = summary.strip()
+    return summaries
 
-This document provides an overview of all original repositories created by [{GITHUB_USERNAME}](https://github.com/{GITHUB_USERNAME}).
+def generate_batch_summaries(repos_details):
+    """Summarise several repositories with one LLM call, falling back to single calls for any it misses
+    
+    Returns a (summary, truncated) pair per repository, like generate_repo_summary().
+    """
+    summaries = [None] * len(repos_details)
+    truncated_flags = [False] * len(repos_details)
+    pending = []
+    for i, repo_details in enumerate(repos_details):
+        cached_summary = None
+        if summary_cache and not FORCE_REFRESH:
+            cached_summary = summary_cache.get(build_repo_prompt(repo_details))
+        if cached_summary:
+            print(f"Using cached LLM summary for {repo_details['name']}.")
+            summaries[i] = cached_summary
+        else:
+            pending.append(i)
+    
+    if len(pending) > 1:
+        batch = [repos_details[i] for i in pending]
+        names = ", ".join(repo_full_name(repo_details) for repo_details in batch)
+        print(f"Generating batched summary for {names}...")
+        try:
+            content, truncated = complete_prompt(build_batch_prompt(batch), names)
+            batch_summaries = parse_batch_summaries(content or "", batch)
+        except Exception as e:
+            print(f"Error generating batched summary for {names}: {e}")
+            batch_summaries, truncated = {}, False
+        
+        for position, summary in batch_summaries.items():
+            summaries[pending[position]] = summary
+            truncated_flags[pending[position]] = truncated
+            # Stored under the single-repository prompt so later runs hit it in either mode
+            if summary_cache and not truncated:
+                summary_cache.put(build_repo_prompt(batch[position]), summary)
+        
+        pending = [i for i in pending if summaries[i] is None]
+        if pending:
+            print(f"Batched response missed {len(pending)} repositories, falling back to single requests.")
+    
+    for i in pending:
+        summaries[i], truncated_flags[i] = generate_repo_summary(repos_details[i])
+    
+    return list(zip(summaries, truncated_flags))
+
+class StateStore:
+    """SQLite record of each repository's timestamps and its most recent summary"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connection(self):
+        # Opened lazily so importing the module never touches OUTPUT_DIR
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS repo_state (
+                    url TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    updated_at TEXT,
+                    pushed_at TEXT,
+                    summary TEXT,
+                    summarised_at TEXT
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+    
+    def get_summary(self, repo_details):
+        """Return the stored summary if the repository has not changed since it was generated"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT updated_at, pushed_at, summary FROM repo_state WHERE url = ?",
+                (repo_details["url"],)
+            ).fetchone()
+        if not row:
+            return None
+        updated_at, pushed_at, summary = row
+        if updated_at != repo_details["updated_at"] or pushed_at != repo_details.get("pushed_at"):
+            return None
+        return summary
+    
+    def record(self, repo_details, summary):
+        """Store the repository's current timestamps alongside its new summary"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO repo_state (url, name, updated_at, pushed_at, summary, summarised_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (repo_details["url"], repo_details["name"], repo_details["updated_at"],
+                 repo_details.get("pushed_at"), summary, datetime.now().isoformat())
+            )
+            conn.commit()
+
+state_store = StateStore(STATE_DB)
+
+def needs_llm_summary(repo_details):
+    """Return True if a repository crosses any threshold for an LLM summary"""
+    return (
+        not EXTRACTIVE_SUMMARIES
+        or repo_details.get("size", 0) >= LLM_MIN_SIZE_KB
+        or repo_details["stars"] >= LLM_MIN_STARS
+        or count_tokens(clean_readme(repo_details["readme"])) >= LLM_MIN_README_TOKENS
+    )
+
+def join_words(words):
+    """Join words as an English list, e.g. a, b and c"""
+    words = list(words)
+    return words[0] if len(words) == 1 else f"{', '.join(words[:-1])} and {words[-1]}"
+
+def extractive_summary(repo_details, max_sentences=3):
+    """Build a deterministic summary from a repository's description, README prose and metadata"""
+    sentences = []
+    description = " ".join(repo_details["description"].split())
+    if description:
+        sentences.append(description if description[-1] in ".!?" else description + ".")
+    
+    # Leading prose sentences of the README, skipping headings, lists, tables and quotes
+    for paragraph in re.split(r"\n\s*\n", clean_readme(repo_details["readme"])):
+        lines = [line.strip() for line in paragraph.splitlines()]
+        prose = " ".join(line for line in lines if line and not re.match(r"(#|[-*+|>]|\d+\.)", line))
+        for sentence in re.split(r"(?<=[.!?])\s+", re.sub(r"[*_`]+", "", prose)):
+            if len(sentences) >= max_sentences:
+                break
+            if len(sentence.split()) >= 4 and sentence.lower().rstrip(".") not in description.lower():
+                sentences.append(sentence)
+    
+    details = []
+    if repo_details["languages"]:
+        details.append(f"is written in {join_words(list(repo_details['languages'])[:3])}")
+    # Commit counts are "Unknown" when every counting strategy failed
+    if isinstance(repo_details["commit_count"], int) and repo_details["commit_count"]:
+        details.append(f"has {repo_details['commit_count']} commits")
+    if repo_details["topics"]:
+        details.append(f"is tagged {join_words(repo_details['topics'][:5])}")
+    if details:
+        sentences.append(f"{repo_details['name']} {join_words(details)}.")
+    
+    return " ".join(sentences) or f"{repo_details['name']} has no description or README."
+
+def summarise_repositories(repos_details):
+    """Return summaries for a group of repositories, reusing stored ones for unchanged repositories
+    
+    With EXTRACTIVE_SUMMARIES, repositories below the LLM thresholds are
+    summarised locally and never sent to the LLM.
+    """
+    summaries = [None] * len(repos_details)
+    changed = []
+    for i, repo_details in enumerate(repos_details):
+        summary = None if FORCE_REFRESH else state_store.get_summary(repo_details)
+        if summary:
+            print(f"Reusing stored summary for unchanged repository {repo_details['name']}.")
+            summaries[i] = summary
+        elif not needs_llm_summary(repo_details):
+            # Not recorded in the state store, so raising a threshold later brings in an LLM summary
+            print(f"Using extractive summary for {repo_details['name']}.")
+            summaries[i] = extractive_summary(repo_details)
+        else:
+            changed.append(i)
+    
+    if len(changed) > 1:
+        generated = generate_batch_summaries([repos_details[i] for i in changed])
+    else:
+        generated = [generate_repo_summary(repos_details[i]) for i in changed]
+    
+    for i, (summary, truncated) in zip(changed, generated):
+        summaries[i] = summary
+        # Cut-off output is used for this run only, so the next run asks again
+        if summary and not truncated:
+            state_store.record(repos_details[i], summary)
+    return summaries
+
+DEFAULT_MARKDOWN_HEADER = """# GitHub Repository Summary
+
+*Generated on $generated_on*
+
+This document provides an overview of all original repositories created by [$username](https://github.com/$username).
 
 ## Overview
 
-- Total Repositories: {len(repos_data)}
-- Primary Languages: {get_primary_languages(repos_data)}
-- Most Active Repositories: {get_most_active_repos(repos_data)}
+- Total Repositories: $total_repos
+- Primary Languages: $primary_languages
+- Most Active Repositories: $most_active
 
 ## Repositories
 
 """
-    
-    # Sort repositories by update date (most recent first)
-    sorted_repos = sorted(repos_data, key=lambda x: x["updated_at"], reverse=True)
-    
-    for repo in sorted_repos:
-        # Format creation and update dates
-        created_date = datetime.strptime(repo["created_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
-        updated_date = datetime.strptime(repo["updated_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
-        
-        # Format languages with percentages
-        total_bytes = sum(repo["languages"].values())
-        languages_formatted = []
-        for lang, bytes_count in repo["languages"].items():
-            percentage = (bytes_count / total_bytes) * 100 if total_bytes > 0 else 0
-            languages_formatted.append(f"{lang} ({percentage:.1f}%)")
-        
-        # Add repository section
-        markdown += f"""### [{repo["name"]}]({repo["url"]})
 
-- **Created:** {created_date}
-- **Last Updated:** {updated_date}
-- **Stars:** {repo["stars"]}
-- **Forks:** {repo["forks"]}
-- **Languages:** {', '.join(languages_formatted)}
-- **Commits:** {repo["commit_count"]}
-- **Topics:** {', '.join(repo["topics"]) if repo["topics"] else "None"}
+DEFAULT_MARKDOWN_REPO = """### [$name]($url)
+
+- **Created:** $created
+- **Last Updated:** $updated
+- **Stars:** $stars
+- **Forks:** $forks
+- **Languages:** $languages
+- **Commits:** $commits
+- **Topics:** $topics
 
-{repo["summary"] if repo["summary"] else "No summary available."}
+$summary
 
 ---
 
 """
+
+DEFAULT_HTML_HEADER = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>GitHub Repository Summary</title>
+</head>
+<body>
+<h1>GitHub Repository Summary</h1>
+<p><em>Generated on $generated_on</em></p>
+<p>This document provides an overview of all original repositories created by <a href="https://github.com/$username">$username</a>.</p>
+<h2>Overview</h2>
+<ul>
+<li>Total Repositories: $total_repos</li>
+<li>Primary Languages: $primary_languages</li>
+<li>Most Active Repositories: $most_active</li>
+</ul>
+<h2>Repositories</h2>
+"""
+
+DEFAULT_HTML_REPO = """<section>
+<h3><a href="$url">$name</a></h3>
+<ul>
+<li><strong>Created:</strong> $created</li>
+<li><strong>Last Updated:</strong> $updated</li>
+<li><strong>Stars:</strong> $stars</li>
+<li><strong>Forks:</strong> $forks</li>
+<li><strong>Languages:</strong> $languages</li>
+<li><strong>Commits:</strong> $commits</li>
+<li><strong>Topics:</strong> $topics</li>
+</ul>
+$summary
+</section>
+"""
+
+DEFAULT_HTML_FOOTER = """</body>
+</html>
+"""
+
+DEFAULT_OBSIDIAN_NOTE = """---
+repository: $name
+url: $url
+created: $created
+updated: $updated
+stars: $stars
+forks: $forks
+commits: $commits
+tags: [$tags]
+---
+
+# $name
+
+$description
+
+- **Languages:** $languages
+- **Topics:** $topics
+
+$summary
+"""
+
+DEFAULT_OBSIDIAN_INDEX = """# GitHub Repository Summary
+
+*Generated on $generated_on*
+
+Repositories created by [$username](https://github.com/$username).
+
+## Overview
+
+- Total Repositories: $total_repos
+- Primary Languages: $primary_languages
+- Most Active Repositories: $most_active
+
+## Repositories
+
+"""
+
+DEFAULT_OBSIDIAN_INDEX_ENTRY = """- [[$note]] $description
+"""
+
+@functools.lru_cache(maxsize=None)
+def load_template(path):
+    """Read and compile a user-supplied template file once per run"""
+    with open(os.path.expanduser(path), "r", encoding="utf-8") as f:
+        return string.Template(f.read())
+
+def repo_template_values(repo):
+    """Return the placeholder values available to repository templates"""
+    # Format creation and update dates
+    created_date = datetime.strptime(repo["created_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
+    updated_date = datetime.strptime(repo["updated_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d")
+    
+    # Format languages with percentages
+    total_bytes = sum(repo["languages"].values())
+    languages_formatted = []
+    for lang, bytes_count in repo["languages"].items():
+        percentage = (bytes_count / total_bytes) * 100 if total_bytes > 0 else 0
+        languages_formatted.append(f"{lang} ({percentage:.1f}%)")
+    
+    return {
+        "name": repo["name"],
+        "url": repo["url"],
+        "description": repo["description"],
+        "created": created_date,
+        "updated": updated_date,
+        "stars": repo["stars"],
+        "forks": repo["forks"],
+        "languages": ', '.join(languages_formatted),
+        "commits": repo["commit_count"],
+        "topics": ', '.join(repo["topics"]) if repo["topics"] else "None",
+        "tags": ', '.join(repo["topics"]),
+        "summary": repo["summary"] if repo["summary"] else "No summary available."
+    }
+
+class MarkdownRenderer:
+    """Render the report as a single markdown document from string.Template templates
+    
+    Templates are compiled once when the renderer is created; HEADER_TEMPLATE
+    and REPO_TEMPLATE replace the built-in ones.
+    """
+    
+    extension = ".md"
+    default_header = DEFAULT_MARKDOWN_HEADER
+    default_repo = DEFAULT_MARKDOWN_REPO
+    footer = ""
+    
+    def __init__(self, header_path=None, repo_path=None):
+        self.header_template = load_template(header_path) if header_path else string.Template(self.default_header)
+        self.repo_template = load_template(repo_path) if repo_path else string.Template(self.default_repo)
+    
+    def render_header(self, values):
+        return self.header_template.substitute(values)
+    
+    def repo_values(self, repo):
+        return repo_template_values(repo)
     
-    return markdown
+    def render_repo(self, repo, index):
+        return self.repo_template.substitute(self.repo_values(repo))
+    
+    def render_footer(self):
+        return self.footer
+
+class HTMLRenderer(MarkdownRenderer):
+    """Render the report as a standalone HTML page"""
+    
+    extension = ".html"
+    default_header = DEFAULT_HTML_HEADER
+    default_repo = DEFAULT_HTML_REPO
+    footer = DEFAULT_HTML_FOOTER
+    
+    def render_header(self, values):
+        return super().render_header({key: html.escape(str(value)) for key, value in values.items()})
+    
+    def repo_values(self, repo):
+        values = {key: html.escape(str(value)) for key, value in repo_template_values(repo).items()}
+        values["summary"] = "\n".join(
+            f"<p>{paragraph}</p>" for paragraph in re.split(r"\n\s*\n", values["summary"]) if paragraph.strip()
+        )
+        return values
 
-def get_primary_languages(repos_data):
-    """Calculate and return the most used languages across all repositories"""
-    language_counts = {}
+class JSONRenderer(MarkdownRenderer):
+    """Render the report as one JSON document with an overview object and a repositories array
+    
+    The document is built directly, so user templates do not apply.
+    """
+    
+    extension = ".json"
+    
+    def render_header(self, values):
+        overview = json.dumps(values, indent=2)
+        return overview[:overview.rindex("}")].rstrip() + ',\n  "repositories": ['
+    
+    def render_repo(self, repo, index):
+        entry = {key: repo[key] for key in (
+            "name", "url", "description", "created_at", "updated_at", "stars",
+            "forks", "languages", "commit_count", "topics", "summary"
+        )}
+        return ("," if index else "") + "\n    " + json.dumps(entry)
+    
+    def render_footer(self):
+        return "\n  ]\n}\n"
+
+class ObsidianRenderer(MarkdownRenderer):
+    """Render one Obsidian note per repository plus an index note linking them"""
+    
+    extension = ".md"
+    default_header = DEFAULT_OBSIDIAN_INDEX
+    default_repo = DEFAULT_OBSIDIAN_NOTE
+    
+    def __init__(self, header_path=None, repo_path=None):
+        super().__init__(header_path, repo_path)
+        self.index_entry_template = string.Template(DEFAULT_OBSIDIAN_INDEX_ENTRY)
+    
+    def repo_values(self, repo):
+        values = repo_template_values(repo)
+        # Obsidian tags cannot contain spaces
+        values["tags"] = ', '.join(topic.replace(" ", "-") for topic in repo["topics"])
+        return values
     
-    for repo in repos_data:
+    def render_index_entry(self, repo, note):
+        description = f"- {repo['description']}" if repo["description"] else ""
+        return self.index_entry_template.substitute(name=repo["name"], note=note, description=description)
+
+RENDERERS = {
+    "markdown": MarkdownRenderer,
+    "html": HTMLRenderer,
+    "json": JSONRenderer,
+    "obsidian": ObsidianRenderer,
+}
+
+# Stand-in repository rendered once so template mistakes surface before any repository is processed
+TEMPLATE_CHECK_REPO = {
+    "name": "example", "owner": "example", "url": "https://github.com/example/example",
+    "description": "", "created_at": "2000-01-01T00:00:00Z", "updated_at": "2000-01-01T00:00:00Z",
+    "stars": 0, "forks": 0, "languages": {}, "commit_count": 0, "topics": [], "summary": None
+}
+
+def create_renderer():
+    """Return the renderer selected by OUTPUT_FORMAT, with any user templates compiled and checked"""
+    if OUTPUT_FORMAT not in RENDERERS:
+        raise ValueError(f"Unknown OUTPUT_FORMAT {OUTPUT_FORMAT!r}, expected one of {', '.join(RENDERERS)}")
+    if OUTPUT_FORMAT == "json" and (HEADER_TEMPLATE or REPO_TEMPLATE):
+        print("Warning: HEADER_TEMPLATE and REPO_TEMPLATE are ignored for OUTPUT_FORMAT=json.")
+    renderer = RENDERERS[OUTPUT_FORMAT](HEADER_TEMPLATE or None, REPO_TEMPLATE or None)
+    
+    checks = (
+        ("HEADER_TEMPLATE", lambda: renderer.render_header(report_header_values(0, "", ""))),
+        ("REPO_TEMPLATE", lambda: renderer.render_repo(TEMPLATE_CHECK_REPO, 0)),
+    )
+    for setting, render in checks:
+        try:
+            render()
+        except KeyError as e:
+            raise ValueError(f"{setting} uses unknown placeholder ${e.args[0]}") from None
+        except ValueError as e:
+            raise ValueError(f"{setting} is not a valid template: {e}") from None
+    return renderer
+
+def report_header_values(total_repos, primary_languages, most_active_repos, owner=GITHUB_USERNAME):
+    """Return the placeholder values available to header templates"""
+    return {
+        "generated_on": datetime.now().strftime("%Y-%m-%d"),
+        "username": owner,
+        "total_repos": total_repos,
+        "primary_languages": primary_languages,
+        "most_active": most_active_repos
+    }
+
+class ReportWriter(abc.ABC):
+    """Write the report one repository at a time instead of building it in memory
+    
+    Repositories are written in listing order as they complete, and the
+    overview totals are accumulated along the way for close().
+    """
+    
+    def __init__(self, repo_full_names, renderer, owner=GITHUB_USERNAME):
+        self.renderer = renderer
+        self.owner = owner
+        # Keyed by owner/name, since member and all listings can hold same-named repositories
+        self._positions = {full_name: i for i, full_name in enumerate(repo_full_names)}
+        self._ready = {}
+        self._next = 0
+        self._total = 0
+        self._language_counts = {}
+        self._most_active = []
+    
+    def add(self, repo_full_name, repo_details):
+        """Record a finished repository (None if skipped) and write every repository now in order"""
+        self._ready[self._positions[repo_full_name]] = repo_details
+        while self._next in self._ready:
+            repo = self._ready.pop(self._next)
+            self._next += 1
+            if repo is not None:
+                self._add_in_order(repo)
+    
+    def _add_in_order(self, repo):
+        self._write(repo, self._total)
+        self._total += 1
+        
         for language in repo["languages"].keys():
-            if language in language_counts:
-                language_counts[language] += 1
-            else:
-                language_counts[language] = 1
+            self._language_counts[language] = self._language_counts.get(language, 0) + 1
+        
+        # Keep only the three highest commit counts, earlier repositories winning ties
+        if isinstance(repo["commit_count"], int):
+            self._most_active.append((repo["commit_count"], -self._total, repo["name"]))
+            self._most_active = sorted(self._most_active, reverse=True)[:3]
+    
+    @abc.abstractmethod
+    def _write(self, repo, index):
+        """Write one repository, the index-th in the report"""
+    
+    def header_values(self):
+        top_languages = sorted(self._language_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        return report_header_values(
+            self._total,
+            ', '.join([lang for lang, count in top_languages]),
+            ', '.join(name for _, _, name in self._most_active) or "Unable to determine",
+            self.owner
+        )
     
-    # Sort by frequency and get top 5
-    top_languages = sorted(language_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    return ', '.join([lang for lang, count in top_languages])
+    def discard(self):
+        """Remove temporary files of a report that will not be closed"""
+    
+    def close(self):
+        """Write anything still held back; repositories that never reported are dropped"""
+        for position in sorted(self._ready):
+            if self._ready[position] is not None:
+                self._add_in_order(self._ready[position])
+        self._ready.clear()
 
-def get_most_active_repos(repos_data):
-    """Return the names of the most active repositories (by commit count)"""
-    valid_repos = [repo for repo in repos_data if isinstance(repo["commit_count"], int)]
-    if not valid_repos:
-        return "Unable to determine"
-    sorted_by_commits = sorted(valid_repos, key=lambda x: x["commit_count"], reverse=True)[:3]
-    return ', '.join([repo["name"] for repo in sorted_by_commits])
+class SingleFileReportWriter(ReportWriter):
+    """Stream repository sections to a temporary body file and prepend the overview on close
+    
+    The overview needs totals across all repositories, so it is written to
+    the final file last, followed by the body.
+    """
+    
+    def __init__(self, file_path, repo_full_names, renderer, owner=GITHUB_USERNAME):
+        super().__init__(repo_full_names, renderer, owner)
+        self.file_path = Path(file_path)
+        self._body = tempfile.NamedTemporaryFile("w+", dir=self.file_path.parent, suffix=".tmp", delete=False)
+    
+    def _write(self, repo, index):
+        self._body.write(self.renderer.render_repo(repo, index))
+    
+    def close(self):
+        super().close()
+        self._body.write(self.renderer.render_footer())
+        self._body.flush()
+        self._body.seek(0)
+        with open(self.file_path, "w") as f:
+            f.write(self.renderer.render_header(self.header_values()))
+            shutil.copyfileobj(self._body, f)
+        
+        self._body.close()
+        os.unlink(self._body.name)
+    
+    def discard(self):
+        if not self._body.closed:
+            self._body.close()
+            os.unlink(self._body.name)
 
-def main():
-    # Create output directory if it doesn't exist
-    output_dir = Path(OUTPUT_DIR)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    print(f"Output will be saved to: {output_dir}")
+class ObsidianNoteWriter(ReportWriter):
+    """Write one note per repository into a vault folder, plus an index note linking them
+    
+    A manifest of content hashes is kept next to the notes, so only notes whose
+    content changed are rewritten. Notes for repositories that no longer exist
+    are removed. This keeps vault sync and file watchers quiet on re-runs.
+    Repositories owned by another account get a note in a folder named after
+    that owner.
+    """
     
-    # Fetch all original repositories
-    repos = fetch_user_repositories()
+    MANIFEST_NAME = ".summariser_notes.json"
     
-    # Process each repository
-    all_repo_data = []
-    for i, repo in enumerate(repos, 1):
-        print(f"Processing repository {i}/{len(repos)}: {repo['name']}")
+    def __init__(self, notes_dir, repo_full_names, renderer, owner=GITHUB_USERNAME):
+        super().__init__(repo_full_names, renderer, owner)
+        self.notes_dir = Path(notes_dir)
+        self.notes_dir.mkdir(parents=True, exist_ok=True)
+        self.file_path = self.notes_dir / OBSIDIAN_INDEX_NOTE
+        self._note_names = {self._note_name(*full_name.split("/", 1)) for full_name in repo_full_names}
+        self._index_entries = []
+        self._written = 0
+        self._unchanged = 0
         
         try:
-            # Fetch detailed information
-            repo_details = fetch_repo_details(repo["name"])
-            
-            # Generate summary using LLM
-            print(f"Generating summary for {repo['name']}...")
-            summary = generate_repo_summary(repo_details)
-            repo_details["summary"] = summary
+            with open(self.notes_dir / self.MANIFEST_NAME, "r") as f:
+                self._manifest = json.load(f)
+        except (OSError, ValueError):
+            self._manifest = {}
+        self._original_manifest = dict(self._manifest)
+    
+    def _note_name(self, owner, name):
+        return name if owner == self.owner else f"{owner}/{name}"
+    
+    def _write_if_changed(self, file_name, content):
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        path = self.notes_dir / file_name
+        if self._manifest.get(file_name) == content_hash and path.exists():
+            self._unchanged += 1
+            return
+        
+        # Replace atomically so watchers never pick up a half-written note
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.notes_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        replace_with_temp_file(tmp_path, path)
+        self._manifest[file_name] = content_hash
+        self._written += 1
+    
+    def _write(self, repo, index):
+        note = self._note_name(repo["owner"], repo["name"])
+        self._write_if_changed(f"{note}.md", self.renderer.render_repo(repo, index))
+        self._index_entries.append(self.renderer.render_index_entry(repo, note))
+    
+    def close(self):
+        super().close()
+        index_content = (
+            self.renderer.render_header(self.header_values())
+            + "".join(self._index_entries)
+            + self.renderer.render_footer()
+        )
+        self._write_if_changed(OBSIDIAN_INDEX_NOTE, index_content)
+        
+        # Remove notes of repositories that are no longer listed at all (skipped ones are kept)
+        removed = 0
+        for file_name in list(self._manifest):
+            if file_name != OBSIDIAN_INDEX_NOTE and file_name[:-len(".md")] not in self._note_names:
+                try:
+                    (self.notes_dir / file_name).unlink()
+                except OSError:
+                    pass
+                del self._manifest[file_name]
+                removed += 1
+        
+        if self._manifest != self._original_manifest:
+            with open(self.notes_dir / self.MANIFEST_NAME, "w") as f:
+                json.dump(self._manifest, f, indent=2, sort_keys=True)
+        
+        print(f"Obsidian notes: {self._written} written, {self._unchanged} unchanged, {removed} removed.")
+
+def target_path(path, target):
+    """Return a per-target variant of a per-run path when several targets are configured"""
+    path = Path(path)
+    if len(GITHUB_TARGETS) <= 1:
+        return path
+    return path.with_name(f"{path.stem}_{target}{path.suffix}")
+
+def create_report_writer(output_dir, owner, repo_full_names):
+    """Return the writer for the configured output format"""
+    renderer = create_renderer()
+    if OUTPUT_FORMAT == "obsidian":
+        notes_dir = Path(output_dir) / OBSIDIAN_NOTES_DIR
+        if len(GITHUB_TARGETS) > 1:
+            notes_dir = notes_dir / owner
+        return ObsidianNoteWriter(notes_dir, repo_full_names, renderer, owner)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"github_summary_{timestamp}{renderer.extension}"
+    return SingleFileReportWriter(target_path(Path(output_dir) / filename, owner), repo_full_names, renderer, owner)
+
+class CheckpointJournal:
+    """Append-only JSONL journal of fully processed repositories, used to resume interrupted runs"""
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+        self._lock = threading.Lock()
+    
+    def load(self):
+        """Return the journaled repository details that have a summary, keyed by owner/name"""
+        completed = {}
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        repo_details = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a partially written last line
+                        continue
+                    if repo_details.get("summary"):
+                        completed[repo_full_name(repo_details)] = repo_details
+        except OSError:
+            pass
+        return completed
+    
+    def open(self, resume):
+        """Start journaling, keeping existing entries only when resuming"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if resume else "w")
+    
+    def append(self, repo_details):
+        with self._lock:
+            self._file.write(json.dumps(repo_details) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def finish(self):
+        """Close and delete the journal once the report has been written"""
+        self._file.close()
+        self.path.unlink()
+
+def process_repositories(repos, fetch_details=None):
+    """Fetch details and generate summaries for the repositories, one LLM batch at a time
+    
+    Yields (listed repository, repo details) as each repository finishes, with
+    None as the details for repositories that had to be skipped.
+    """
+    fetch_details = fetch_details or get_repo_details_fetcher(repos)
+    for start in range(0, len(repos), LLM_BATCH_SIZE):
+        batch = []
+        for i, repo in enumerate(repos[start:start + LLM_BATCH_SIZE], start + 1):
+            print(f"Processing repository {i}/{len(repos)}: {repo['name']}")
             
-            all_repo_data.append(repo_details)
+            try:
+                # Fetch detailed information
+                batch.append((repo, fetch_details(repo["name"], repo_owner(repo))))
+            except Exception as e:
+                print(f"Error processing repository {repo['name']}: {e}")
+                print(f"Skipping {repo['name']} and continuing with next repository.")
+                yield repo, None
+        
+        if not batch:
+            continue
+        
+        names = ", ".join(repo["name"] for repo, _ in batch)
+        try:
+            # Generate summaries using LLM
+            print(f"Generating summary for {names}...")
+            summaries = summarise_repositories([repo_details for _, repo_details in batch])
         except Exception as e:
-            print(f"Error processing repository {repo['name']}: {e}")
-            print(f"Skipping {repo['name']} and continuing with next repository.")
+            print(f"Error processing repositories {names}: {e}")
+            print(f"Skipping {names} and continuing with next repository.")
+            for repo, _ in batch:
+                yield repo, None
+            continue
+        
+        for (repo, repo_details), summary in zip(batch, summaries):
+            repo_details["summary"] = summary
+            yield repo, repo_details
+
+def process_repositories_pipelined(repos, fetch_details=None):
+    """Fetch and summarise repositories in bounded worker pools
     
-    # Create the markdown summary
-    markdown_content = create_markdown_summary(all_repo_data)
+    Yields (listed repository, repo details) in completion order, with None
+    as the details for repositories that had to be skipped.
+    """
+    print(f"Running pipeline with {FETCH_CONCURRENCY} fetch worker(s) and {LLM_CONCURRENCY} LLM worker(s).")
+    fetch_details = fetch_details or get_repo_details_fetcher(repos)
+    results = [None] * len(repos)
     
-    # Save to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"github_summary_{timestamp}.md"
-    file_path = output_dir / filename
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as fetch_pool, \
+         ThreadPoolExecutor(max_workers=LLM_CONCURRENCY) as summary_pool:
+        fetch_futures = {
+            fetch_pool.submit(fetch_details, repo["name"], repo_owner(repo)): i
+            for i, repo in enumerate(repos)
+        }
+        
+        # Hand repositories to the LLM pool as soon as a batch of details has arrived, and yield
+        # summaries as they finish rather than after the slowest fetch
+        summary_futures = {}
+        pending = []
+        fetched = 0
+        while fetch_futures or summary_futures:
+            done, _ = wait(list(fetch_futures) + list(summary_futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetch_futures:
+                    i = fetch_futures.pop(future)
+                    name = repos[i]["name"]
+                    fetched += 1
+                    try:
+                        repo_details = future.result()
+                    except Exception as e:
+                        print(f"Error processing repository {name}: {e}")
+                        print(f"Skipping {name} and continuing with next repository.")
+                        yield repos[i], None
+                    else:
+                        print(f"Fetched repository {fetched}/{len(repos)}: {name}, queueing summary...")
+                        results[i] = repo_details
+                        pending.append(i)
+                    
+                    # The last partial batch goes out once nothing else is left to fetch
+                    if pending and (len(pending) == LLM_BATCH_SIZE or not fetch_futures):
+                        summary_futures[summary_pool.submit(summarise_repositories, [results[j] for j in pending])] = pending
+                        pending = []
+                    continue
+                
+                indices = summary_futures.pop(future)
+                try:
+                    summaries = future.result()
+                except Exception as e:
+                    names = ", ".join(results[i]["name"] for i in indices)
+                    print(f"Error generating summary for {names}: {e}")
+                    summaries = [None] * len(indices)
+                for i, summary in zip(indices, summaries):
+                    repo_details, results[i] = results[i], None
+                    repo_details["summary"] = summary
+                    yield repos[i], repo_details
+
+def list_target_repositories(target):
+    """List the repositories of one user or organisation that pass the listing filters"""
+    if DATA_SOURCE == "local" and not LOCAL_CLONE_MISSING:
+        repos = list_local_repositories(target)
+    elif ASYNC_FETCH:
+        repos = asyncio.run(async_fetch_user_repositories(target))
+    else:
+        repos = fetch_user_repositories(target)
     
-    with open(file_path, "w") as f:
-        f.write(markdown_content)
+    for repo in repos:
+        repo.setdefault("owner", {"login": target})
     
-    print(f"Summary saved to: {file_path}")
+    if DATA_SOURCE == "local" and LOCAL_CLONE_MISSING:
+        clone_missing_repositories(repos, target)
+    return repos
+
+def main():
+    # Create output directory if it doesn't exist
+    output_dir = Path(OUTPUT_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Output will be saved to: {output_dir}")
+    
+    # List every target first so one pipeline, rate limiter and LLM queue serve them all
+    repos_by_target = {target: list_target_repositories(target) for target in GITHUB_TARGETS}
+    
+    writers = {}
+    journals = {}
+    try:
+        pending = []
+        for target, repos in repos_by_target.items():
+            # Sections are written as repositories finish, in listing order
+            writer = create_report_writer(output_dir, target, [listing_full_name(repo) for repo in repos])
+            writers[target] = writer
+        
+            # Reload repositories completed by an interrupted run and journal the rest as they finish
+            journal = CheckpointJournal(target_path(CHECKPOINT_FILE, target))
+            journals[target] = journal
+            completed = journal.load() if RESUME else {}
+            journal.open(resume=RESUME)
+            if completed:
+                done = sum(1 for repo in repos if listing_full_name(repo) in completed)
+                print(f"Resuming {target}: {done} repositories already processed, {len(repos) - done} remaining.")
+        
+            for repo in repos:
+                full_name = listing_full_name(repo)
+                if full_name in completed:
+                    writer.add(full_name, completed.pop(full_name))
+                else:
+                    pending.append((target, repo))
+        
+        # Results are routed back by listing object rather than owner, since REPO_TYPE=member or all
+        # lists repositories owned by other accounts
+        pending_repos = [repo for _, repo in pending]
+        target_by_repo = {id(repo): target for target, repo in pending}
+        
+        # Process each repository
+        fetch_details = get_repo_details_fetcher(pending_repos)
+        if PIPELINE_MODE:
+            processed = process_repositories_pipelined(pending_repos, fetch_details)
+        else:
+            processed = process_repositories(pending_repos, fetch_details)
+        
+        try:
+            for repo, repo_details in processed:
+                target = target_by_repo[id(repo)]
+                # Repositories without a summary are left out so a resumed run retries them
+                if repo_details is not None and repo_details["summary"]:
+                    journals[target].append(repo_details)
+                writers[target].add(listing_full_name(repo), repo_details)
+        finally:
+            # Local mirror mode reads repositories in worker processes that must be shut down
+            if hasattr(fetch_details, "close"):
+                fetch_details.close()
+        
+        for target in GITHUB_TARGETS:
+            writers[target].close()
+            print(f"Summary for {target} saved to: {writers[target].file_path}")
+            journals[target].finish()
+        
+        print(token_usage.report())
+        if len(llm_pool.endpoints) > 1:
+            print(llm_pool.report())
+    finally:
+        # A failed run must not leave the writers' temporary body files behind
+        for writer in writers.values():
+            writer.discard()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file